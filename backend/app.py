@@ -1,35 +1,117 @@
-from flask import Flask
+from flask import Flask, request, g
 from flask_cors import CORS
-from routes.chat_routes import chat_bp
-from routes.conversation_routes import conversation_bp
-from routes.health_routes import health_bp
-from utils.logging_config import setup_logging
 from config import Config
 from dotenv import load_dotenv
 import os
+import sys
+import time
+import uuid
+import pymongo
+import logging
 
-# Setup logging
-setup_logging()
-
-# Initialize Flask app
-app = Flask(__name__)
-# Get allowed origins from environment or use defaults
-ALLOWED_ORIGINS = os.getenv('ALLOWED_ORIGINS', 'http://localhost:8000,https://bozothegrey.github.io').split(',')
-
-# Configure CORS for multiple allowed origins
-CORS(app, resources={
-    r"/*": {
-        "origins": ALLOWED_ORIGINS,
-        "allow_headers": ["Content-Type", "Authorization"],
-        "methods": ["GET", "POST", "OPTIONS"],
-        "supports_credentials": True
-    }
-})
-
-# Register blueprints
-app.register_blueprint(conversation_bp)
-app.register_blueprint(health_bp)
-app.register_blueprint(chat_bp)
+logger = logging.getLogger(__name__)
+
+def create_app(config=Config):
+    """Build the Flask application; no connections are opened here"""
+    started = time.perf_counter()
+    if config is not Config:
+        # Every module reads Config directly, so overrides (e.g. a test subclass) are applied there
+        for key in dir(config):
+            if key.isupper():
+                setattr(Config, key, getattr(config, key))
+
+    from utils.logging_config import setup_logging
+    setup_logging()
+
+    from routes.chat_routes import chat_bp
+    from routes.conversation_routes import conversation_bp
+    from routes.health_routes import health_bp
+    from routes.admin_routes import admin_bp
+    from utils.compression import compress_response
+    from utils.profiling import init_profiling
+    from utils.traffic_capture import init_capture
+
+    # Initialize Flask app
+    app = Flask(__name__)
+    app.config.from_object(Config)
+    # Get allowed origins from environment or use defaults
+    allowed_origins = os.getenv('ALLOWED_ORIGINS', 'http://localhost:8000,https://bozothegrey.github.io').split(',')
+
+    # Configure CORS for multiple allowed origins
+    CORS(app, resources={
+        r"/*": {
+            "origins": allowed_origins,
+            "allow_headers": ["Content-Type", "Authorization"],
+            "methods": ["GET", "POST", "OPTIONS"],
+            "supports_credentials": True
+        }
+    })
+
+    @app.before_request
+    def assign_request_id():
+        """Tag each request so log records can be correlated"""
+        g.request_id = request.headers.get("X-Request-ID") or uuid.uuid4().hex
+
+    @app.after_request
+    def echo_request_id(response):
+        response.headers["X-Request-ID"] = g.get("request_id", "")
+        return response
+
+    @app.after_request
+    def compress(response):
+        return compress_response(response, request)
+
+    init_profiling(app)
+    init_capture(app)
+
+    # Register blueprints
+    app.register_blueprint(conversation_bp)
+    app.register_blueprint(health_bp)
+    app.register_blueprint(chat_bp)
+    app.register_blueprint(admin_bp)
+
+    logger.info(f"Application created in {(time.perf_counter() - started) * 1000:.1f} ms")
+    return app
+
+def warmup():
+    """Open pooled connections and load caches before the process takes traffic"""
+    from models.database import get_client
+    from models.conversation import ConversationModel
+    from services.ai_service import get_http_session
+    from services.health_service import health_monitor
+
+    timings = {}
+
+    def step(name, func, mongo=False):
+        started = time.perf_counter()
+        try:
+            if mongo:
+                # One deadline per step covering server selection and every operation in it
+                with pymongo.timeout(Config.WARMUP_MONGO_TIMEOUT):
+                    func()
+            else:
+                func()
+            return True
+        except Exception as e:
+            logger.warning(f"Warmup step {name} failed: {str(e)}")
+            return False
+        finally:
+            timings[name] = round((time.perf_counter() - started) * 1000, 1)
+
+    if step("mongo_ping", lambda: get_client().admin.command("ping"), mongo=True):
+        step("indexes", lambda: ConversationModel().ensure_indexes(), mongo=True)
+    else:
+        logger.warning("Mongo unreachable, skipping index warmup")
+    if Config.WARMUP_HTTP:
+        # Any response will do, the point is an open keep-alive TLS connection
+        step("ai_api", lambda: get_http_session().head(Config.DEEPSEEK_API_URL, timeout=Config.TIMEOUT_PROFILE["fallback"]))
+
+    # First health snapshot runs synchronously so readiness is known before traffic
+    step("health", health_monitor.refresh)
+    health_monitor.start()
+
+    logger.info(f"Warmup finished in {sum(timings.values()):.1f} ms: {timings}")
+    return timings
 
 if __name__ == "__main__":
     #checking env
@@ -37,5 +119,7 @@ if __name__ == "__main__":
     # Add this to your app.py for debugging
     print(f"MONGODB_URI: {os.getenv('MONGODB_URI')[:20]}..." if os.getenv('MONGODB_URI') else "MONGODB_URI not set")
     print(f"DEEPSEEK_API_KEY: {os.getenv('DEEPSEEK_API_KEY')[:10]}..." if os.getenv('DEEPSEEK_API_KEY') else "DEEPSEEK_API_KEY not set")
-    print("Starting Flask application...")
-    app.run(host=Config.HOST, port=Config.PORT, debug=True)
+    print("Starting Flask development server (use gunicorn -c gunicorn.conf.py in production)...")
+    app = create_app()
+    warmup()
+    app.run(host=Config.HOST, port=Config.PORT, debug="debug" in sys.argv[1:])
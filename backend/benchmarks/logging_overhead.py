@@ -0,0 +1,73 @@
+"""Measure logging overhead per chat request: legacy synchronous handlers vs the queue pipeline.
+
+Run from backend/: python -m benchmarks.logging_overhead [requests]
+"""
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+from config import Config
+from utils import logging_config
+
+# Roughly what one /chat turn logs on the request thread
+def simulate_chat_turn(logger, user_id, message):
+    logger.info("💬 New message from %s (%d chars)", user_id, len(message))
+    logger.debug("Message from %s: %s", user_id, message)
+    logger.info("Active conversation exists for %s - continuing", user_id)
+    logger.info("💬 Message exchanged for user %s (conversation ongoing - %d messages in session)", user_id, 12)
+
+def legacy_setup(log_dir, stream):
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    for handler in (logging.StreamHandler(stream), logging.FileHandler(os.path.join(log_dir, 'conversations.log'))):
+        handler.setFormatter(formatter)
+        root.addHandler(handler)
+    root.setLevel(logging.INFO)
+
+def run(requests, spacing=0.0002):
+    """Time each simulated request; spacing lets the listener drain like real traffic would"""
+    logger = logging.getLogger("routes.chat_routes")
+    message = "Why is the sky blue and why do stars twinkle at night?"
+    timings = []
+    for i in range(requests):
+        start = time.perf_counter()
+        simulate_chat_turn(logger, f"user-{i % 50}", message)
+        timings.append((time.perf_counter() - start) * 1e6)
+        time.sleep(spacing)
+    timings.sort()
+    return {
+        "mean": statistics.fmean(timings),
+        "p50": timings[len(timings) // 2],
+        "p99": timings[int(len(timings) * 0.99)],
+        "max": timings[-1]
+    }
+
+def main():
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    with tempfile.TemporaryDirectory() as log_dir, open(os.devnull, "w") as devnull:
+        stdout = sys.stdout
+        try:
+            sys.stdout = devnull
+            legacy_setup(log_dir, devnull)
+            legacy = run(requests)
+
+            Config.LOG_DIR = log_dir
+            Config.LOG_RATE_LIMITS = {}
+            logging_config.setup_logging()
+            queued = run(requests)
+            logging_config.stop_logging()
+        finally:
+            sys.stdout = stdout
+
+    print(f"requests: {requests} (logging time per request, microseconds)")
+    print(f"{'':30}{'mean':>8}{'p50':>8}{'p99':>8}{'max':>10}")
+    for name, result in (("legacy synchronous handlers", legacy), ("queue + background listener", queued)):
+        print(f"{name:30}{result['mean']:8.1f}{result['p50']:8.1f}{result['p99']:8.1f}{result['max']:10.1f}")
+    print(f"dropped records: {logging_config.DroppingQueueHandler.dropped}")
+
+if __name__ == "__main__":
+    main()
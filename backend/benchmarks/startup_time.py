@@ -0,0 +1,48 @@
+"""Measure cold start: interpreter + imports + create_app, optionally followed by warmup.
+
+Run from backend/: python -m benchmarks.startup_time [runs] [--warmup]
+Worker restart times are logged by gunicorn.conf.py ("Worker N ready X ms after fork").
+"""
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+CHILD = """
+import json, time
+started = time.perf_counter()
+from app import create_app, warmup
+create_app()
+created = time.perf_counter()
+timings = warmup() if {warmup} else {{}}
+print(json.dumps({{"create_app_ms": (created - started) * 1000, "warmup_ms": sum(timings.values()), "warmup": timings}}))
+"""
+
+def main():
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    runs = int(args[0]) if args else 5
+    with_warmup = "--warmup" in sys.argv
+    backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+    totals, creates, warmups = [], [], []
+    for _ in range(runs):
+        started = time.perf_counter()
+        output = subprocess.run(
+            [sys.executable, "-c", CHILD.format(warmup=with_warmup)],
+            cwd=backend_dir, capture_output=True, text=True, check=True
+        ).stdout.strip().splitlines()[-1]
+        totals.append((time.perf_counter() - started) * 1000)
+        result = json.loads(output)
+        creates.append(result["create_app_ms"])
+        warmups.append(result["warmup_ms"])
+
+    print(f"runs: {runs}")
+    print(f"process start to ready: median {statistics.median(totals):8.1f} ms, max {max(totals):8.1f} ms")
+    print(f"imports + create_app:   median {statistics.median(creates):8.1f} ms, max {max(creates):8.1f} ms")
+    if with_warmup:
+        print(f"warmup:                 median {statistics.median(warmups):8.1f} ms, max {max(warmups):8.1f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,214 @@
+"""Replay captured traffic (CAPTURE_ENABLED=true) against a local instance and compare versions.
+
+Run from backend/:
+  python -m benchmarks.traffic_replay captures/*.ndjson --speed 4 --stub-llm-port 8089 --output new.json
+  python -m benchmarks.traffic_replay --compare old.json new.json
+
+Start the app under test pointed at the stub LLM so only our own latency is measured:
+  DEEPSEEK_API_URL=http://127.0.0.1:8089/v1/chat/completions LLM_HEALTH_URL=http://127.0.0.1:8089/models
+"""
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Lock, Thread, local
+import argparse
+import json
+import random
+import statistics
+import time
+import requests
+
+FILLER = "why do cats purr and how far away is the moon "
+
+def load_traces(paths):
+    traces = []
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            traces.extend(json.loads(line) for line in f if line.strip())
+    traces.sort(key=lambda trace: trace["t"])
+    return traces
+
+def percentiles(values):
+    if not values:
+        return {}
+    values = sorted(values)
+    pick = lambda q: values[min(len(values) - 1, int(len(values) * q))]
+    return {
+        "count": len(values),
+        "mean": round(statistics.fmean(values), 1),
+        "p50": round(pick(0.5), 1),
+        "p90": round(pick(0.9), 1),
+        "p99": round(pick(0.99), 1),
+        "max": round(values[-1], 1)
+    }
+
+class StubLLM:
+    """OpenAI-style chat completion endpoint that answers with recorded latencies and sizes"""
+    def __init__(self, traces, port, seed=0):
+        calls = [call for trace in traces for call in trace.get("llm", [])]
+        self.calls = calls or [{"latency_ms": 1000, "chars": 200}]
+        self.random = random.Random(seed)
+        self.lock = Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                with stub.lock:
+                    call = stub.random.choice(stub.calls)
+                time.sleep(call["latency_ms"] / 1000)
+                content = (FILLER * (call["chars"] // len(FILLER) + 1))[:call["chars"]]
+                self._reply({"choices": [{"message": {"role": "assistant", "content": content}}]})
+
+            def do_GET(self):
+                self._reply({"object": "list", "data": []})
+
+            def do_HEAD(self):
+                self.send_response(200)
+                self.end_headers()
+
+            def _reply(self, payload):
+                body = json.dumps(payload).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+        self.thread = Thread(target=self.server.serve_forever, daemon=True)
+
+    def start(self):
+        self.thread.start()
+
+    def stop(self):
+        self.server.shutdown()
+
+class Replayer:
+    def __init__(self, base_url, speed=1.0, concurrency=64):
+        self.base_url = base_url.rstrip("/")
+        self.speed = speed
+        self.concurrency = concurrency
+        self.sessions = local()
+        self.results = []
+        self.lock = Lock()
+
+    def _session(self):
+        if not hasattr(self.sessions, "session"):
+            self.sessions.session = requests.Session()
+        return self.sessions.session
+
+    def build_request(self, trace):
+        """Rebuild a request from an anonymized trace with synthetic user ids and text"""
+        body = dict(trace.get("body", {}))
+        if trace.get("user"):
+            body["user_id"] = f"replay-{trace['user']}"
+        chars = body.pop("message_chars", None)
+        if chars is not None:
+            body["message"] = (FILLER * (chars // len(FILLER) + 1))[:chars] or "hi"
+        if trace.get("content_type") == "form":
+            return {"data": body}
+        return {"json": body}
+
+    def send(self, trace, scheduled):
+        lag_ms = (time.perf_counter() - scheduled) * 1000
+        started = time.perf_counter()
+        try:
+            response = self._session().request(
+                trace["method"], self.base_url + trace["path"], timeout=120, **self.build_request(trace)
+            )
+            status = response.status_code
+        except requests.RequestException:
+            status = None
+        latency_ms = (time.perf_counter() - started) * 1000
+        with self.lock:
+            self.results.append({"path": trace["path"], "status": status, "latency_ms": latency_ms, "lag_ms": lag_ms})
+
+    def run(self, traces):
+        """Open-loop replay: requests fire on the captured schedule regardless of response times"""
+        if not traces:
+            return
+        first = traces[0]["t"]
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            for trace in traces:
+                scheduled = start + (trace["t"] - first) / self.speed
+                delay = scheduled - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                executor.submit(self.send, trace, scheduled)
+
+    def summary(self, traces):
+        paths = sorted({trace["path"] for trace in traces})
+        report = {"speed": self.speed, "requests": len(self.results), "paths": {}}
+        for path in paths:
+            results = [result for result in self.results if result["path"] == path]
+            report["paths"][path] = {
+                "replayed": percentiles([result["latency_ms"] for result in results]),
+                "captured": percentiles([trace["latency_ms"] for trace in traces if trace["path"] == path]),
+                "errors": sum(1 for result in results if result["status"] is None or result["status"] >= 500),
+                "schedule_lag_p99": percentiles([result["lag_ms"] for result in results]).get("p99")
+            }
+        return report
+
+def mongo_opcounters(uri):
+    from pymongo import MongoClient
+    return MongoClient(uri).admin.command("serverStatus")["opcounters"]
+
+def compare(old_path, new_path):
+    with open(old_path) as f:
+        old = json.load(f)
+    with open(new_path) as f:
+        new = json.load(f)
+    print(f"{'path':28}{'p50 old':>10}{'p50 new':>10}{'p99 old':>10}{'p99 new':>10}{'errors':>10}")
+    for path in sorted(set(old["paths"]) | set(new["paths"])):
+        a = old["paths"].get(path, {}).get("replayed", {})
+        b = new["paths"].get(path, {}).get("replayed", {})
+        errors = f"{old['paths'].get(path, {}).get('errors', '-')}/{new['paths'].get(path, {}).get('errors', '-')}"
+        print(f"{path:28}{a.get('p50', '-'):>10}{b.get('p50', '-'):>10}{a.get('p99', '-'):>10}{b.get('p99', '-'):>10}{errors:>10}")
+    if "mongo_ops" in old and "mongo_ops" in new:
+        for op in sorted(set(old["mongo_ops"]) | set(new["mongo_ops"])):
+            print(f"mongo {op:22}{old['mongo_ops'].get(op, 0):>10}{new['mongo_ops'].get(op, 0):>10}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay captured traffic against a local instance")
+    parser.add_argument("captures", nargs="*")
+    parser.add_argument("--base-url", default="http://127.0.0.1:10000")
+    parser.add_argument("--speed", type=float, default=1.0, help="1 = real time, 4 = four times faster")
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--stub-llm-port", type=int, help="serve a stub LLM with the recorded latencies")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--mongo-uri", help="record serverStatus opcounter deltas for the run")
+    parser.add_argument("--output", help="write the summary JSON here")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"))
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    traces = load_traces(args.captures)
+    stub = None
+    if args.stub_llm_port:
+        stub = StubLLM(traces, args.stub_llm_port, args.seed)
+        stub.start()
+
+    before = mongo_opcounters(args.mongo_uri) if args.mongo_uri else None
+    replayer = Replayer(args.base_url, args.speed, args.concurrency)
+    replayer.run(traces)
+    report = replayer.summary(traces)
+    if before is not None:
+        after = mongo_opcounters(args.mongo_uri)
+        report["mongo_ops"] = {op: after[op] - before.get(op, 0) for op in after}
+    if stub:
+        stub.stop()
+
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -5,10 +5,14 @@ class Config:
     # MongoDB Configuration
     MONGODB_URI = os.getenv("MONGODB_URI")
     DATABASE_NAME = "kids_chat"
+    MONGO_MAX_POOL_SIZE = int(os.getenv("MONGO_MAX_POOL_SIZE", 50))
     
     # API Configuration
     DEEPSEEK_API_KEY = os.getenv('DEEPSEEK_API_KEY')
-    DEEPSEEK_API_URL = "https://api.deepseek.com/v1/chat/completions"
+    DEEPSEEK_API_URL = os.getenv("DEEPSEEK_API_URL", "https://api.deepseek.com/v1/chat/completions")
+    HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", 10))
+    # Cheap endpoint for reachability checks; point it at a stub in local/perf setups
+    LLM_HEALTH_URL = os.getenv("LLM_HEALTH_URL", "https://api.deepseek.com/models")
     
     # Conversation Settings
     CONVERSATION_TIMEOUT = 5 * 60  # 5 minutes in seconds
@@ -16,6 +20,14 @@ class Config:
     # Conversation topic change
     TOPIC_OVERLAP_THRESHOLD = 0.3
 
+    # Local topic extraction
+    TOPIC_MAX_TOPICS = 5
+    TOPIC_PHRASE_BOOST = 1.5
+    TOPIC_MIN_TOKENS = 30  # content words needed for a fully confident ranking
+    TOPIC_MIN_CORPUS_DOCS = 50  # conversations needed before IDF weights are trusted
+    TOPIC_CONFIDENCE_THRESHOLD = 0.4
+    TOPIC_LLM_REFINEMENT = os.getenv("TOPIC_LLM_REFINEMENT", "false").lower() == "true"
+
     # Timeout Profiles
     TIMEOUT_PROFILE = {
         "simple": 15,
@@ -26,9 +38,79 @@ class Config:
     # Thread Pool Settings
     MAX_WORKERS = 4
     
+    # Logging
+    LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+    LOG_FORMAT = os.getenv("LOG_FORMAT", "text")  # "text" or "json"
+    LOG_DIR = os.getenv("LOG_DIR", ".")
+    LOG_ROTATION = os.getenv("LOG_ROTATION", "size")  # "size", "time" or "external" (logrotate)
+    # Set by gunicorn.conf.py: worker processes share the log files, so rotation must be external
+    LOG_MULTIPROCESS = False
+    LOG_MAX_BYTES = 10 * 1024 * 1024
+    LOG_ROTATE_WHEN = "midnight"
+    LOG_BACKUP_COUNT = 5
+    LOG_QUEUE_SIZE = 10000
+    # Per-logger sampling (fraction kept) and rate limits (records/second) for INFO and below
+    LOG_SAMPLE_RATES = {}
+    LOG_RATE_LIMITS = {
+        "routes.chat_routes": 50,
+        "services.conversation_service": 50
+    }
+
     # Flask Settings
     HOST = "0.0.0.0"
     PORT = int(os.environ.get("PORT", 10000))
+
+    # Cold-storage archive
+    ARCHIVE_AFTER_DAYS = int(os.getenv("ARCHIVE_AFTER_DAYS", 90))
+    ARCHIVE_STORE = os.getenv("ARCHIVE_STORE", "mongo")  # "mongo" or "file"
+    ARCHIVE_DIR = os.getenv("ARCHIVE_DIR", "archive")
+    ARCHIVE_COMPRESSION_LEVEL = 6
+
+    # Admin endpoints (disabled unless ADMIN_TOKEN is set; send it as X-Admin-Token)
+    ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+
+    # Bulk export
+    EXPORT_BATCH_SIZE = 1000  # cursor batch and Parquet row group size
+    EXPORT_PART_SIZE = 100000  # conversations per part file / checkpoint
+    EXPORT_GZIP_LEVEL = 6
+
+    # Per-request profiling: admins send X-Profile: sample|cprofile and/or X-Profile-Memory: 1
+    PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", 0))  # fraction of requests profiled
+    # "sample" or "cprofile"; under gevent sample falls back to cprofile, which then covers every greenlet
+    PROFILE_DEFAULT_MODE = "sample"
+    PROFILE_INTERVAL = 0.005  # seconds between stack samples
+    PROFILE_TRACEMALLOC = os.getenv("PROFILE_TRACEMALLOC", "false").lower() == "true"
+    PROFILE_TRACEMALLOC_FRAMES = 10
+    PROFILE_TRACEMALLOC_TOP = 50
+    PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+    PROFILE_MAX_FILES = 200
+
+    # Traffic capture for replay testing (message text is never stored, user ids are HMAC-hashed)
+    CAPTURE_ENABLED = os.getenv("CAPTURE_ENABLED", "false").lower() == "true"
+    CAPTURE_DIR = os.getenv("CAPTURE_DIR", "captures")
+    # Required with CAPTURE_ENABLED: keep it fixed so a user hashes the same across restarts and workers
+    CAPTURE_SALT = os.getenv("CAPTURE_SALT")
+    CAPTURE_PATHS = ("/chat", "/api/auto-save", "/api/end-conversation")
+    CAPTURE_QUEUE_SIZE = 10000
+
+    # Health probes
+    HEALTH_REFRESH_SECONDS = 15
+    HEALTH_MAX_AGE_SECONDS = 3 * HEALTH_REFRESH_SECONDS
+    HEALTH_MONGO_TIMEOUT = 2  # seconds, includes server selection
+
+    # HTTP caching and compression for read endpoints
+    USER_VERSION_CACHE_SECONDS = 2
+    COMPRESSION_MIN_SIZE = 1024  # bytes
+    COMPRESSION_GZIP_LEVEL = 6
+    COMPRESSION_BROTLI_QUALITY = 5
+
+    # Production server (gunicorn.conf.py)
+    GUNICORN_WORKER_CLASS = os.getenv("GUNICORN_WORKER_CLASS", "gthread")  # "gthread" or "gevent"
+    GUNICORN_WORKERS = int(os.getenv("GUNICORN_WORKERS", 2))
+    GUNICORN_THREADS = int(os.getenv("GUNICORN_THREADS", 8))
+    GUNICORN_TIMEOUT = 60  # longer than the slowest AI call
+    WARMUP_HTTP = os.getenv("WARMUP_HTTP", "true").lower() == "true"
+    WARMUP_MONGO_TIMEOUT = float(os.getenv("WARMUP_MONGO_TIMEOUT", 3))  # seconds per Mongo warmup step
     
     # System Prompts
     SYSTEM_PROMPT = """You are a friendly AI tutor for children aged 6-12. 
@@ -46,6 +128,8 @@ Key requirements:
     TOPICS_PROMPT = """This is an online conversation between an AI and a child: 
     {conversation_text}
     
+    Candidate keywords: {candidates}
+    
     You will now write a list of topics covered in this conversation as a sequence of words separated by commas:"""
 
     SUMMARY_PROMPT = """Act as a child development expert analyzing this conversation. Create or, if a previous profile is provided, 
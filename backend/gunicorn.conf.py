@@ -0,0 +1,62 @@
+"""Production server: gunicorn -c gunicorn.conf.py
+
+The app is preloaded in the master so workers fork with code already imported;
+each worker then builds its own Mongo/HTTP pools and warms up before serving.
+"""
+import os
+from dotenv import load_dotenv
+
+# Config reads the environment at import time, so .env must be loaded first
+load_dotenv()
+
+if os.getenv("GUNICORN_WORKER_CLASS") == "gevent":
+    # Must happen before anything imports socket/ssl (requires the gevent package)
+    from gevent import monkey
+    monkey.patch_all()
+
+import time
+import logging
+from config import Config
+
+# Master and workers append to the same log files; use LOG_ROTATION=external with logrotate
+Config.LOG_MULTIPROCESS = True
+
+_config_loaded = time.monotonic()
+
+wsgi_app = "wsgi:app"
+bind = f"{Config.HOST}:{Config.PORT}"
+preload_app = True
+worker_class = Config.GUNICORN_WORKER_CLASS
+workers = Config.GUNICORN_WORKERS
+threads = Config.GUNICORN_THREADS if worker_class == "gthread" else 1
+worker_connections = 200  # gevent only
+timeout = Config.GUNICORN_TIMEOUT
+graceful_timeout = 30
+keepalive = 5
+
+def when_ready(server):
+    server.log.info(f"Cold start: master ready in {(time.monotonic() - _config_loaded) * 1000:.1f} ms (including preload)")
+
+def pre_fork(server, worker):
+    worker.fork_started = time.monotonic()
+
+def post_fork(server, worker):
+    # Sockets, pools and threads inherited from the master are not safe to reuse
+    from models.database import reset_client
+    from services.ai_service import reset_http_session
+    from utils.logging_config import reinit_after_fork
+
+    reinit_after_fork()
+    reset_client()
+    reset_http_session()
+
+def post_worker_init(worker):
+    from app import warmup
+
+    warmup()
+    elapsed = (time.monotonic() - worker.fork_started) * 1000
+    logging.getLogger("gunicorn.worker").info(f"Worker {worker.pid} ready {elapsed:.1f} ms after fork")
+
+def worker_exit(server, worker):
+    if hasattr(worker, "fork_started"):
+        server.log.info(f"Worker {worker.pid} exiting after {time.monotonic() - worker.fork_started:.0f} s")
@@ -0,0 +1,135 @@
+from bson import Binary
+from datetime import datetime, timezone
+from config import Config
+from models.database import get_database
+import json
+import os
+import zlib
+import logging
+
+try:
+    import zstandard
+except ImportError:  # zstd is optional, zlib is always available
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+def default_codec():
+    return "zstd" if zstandard is not None else "zlib"
+
+def compress_messages(messages, codec):
+    data = json.dumps(messages, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    if codec == "zstd":
+        return zstandard.ZstdCompressor(level=Config.ARCHIVE_COMPRESSION_LEVEL).compress(data)
+    return zlib.compress(data, Config.ARCHIVE_COMPRESSION_LEVEL)
+
+def decompress_messages(blob, codec):
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("Archived with zstd but the zstandard package is not installed")
+        data = zstandard.ZstdDecompressor().decompress(blob)
+    else:
+        data = zlib.decompress(blob)
+    return json.loads(data.decode("utf-8"))
+
+class MongoArchiveStore:
+    """Compressed message blobs in a separate collection, outside the hot working set"""
+    name = "mongo"
+
+    def __init__(self):
+        self.archive_col = get_database()["conversations_archive"]
+
+    def put(self, conversation_id, user_id, blob, codec):
+        self.archive_col.replace_one(
+            {"_id": conversation_id},
+            {
+                "_id": conversation_id,
+                "user_id": user_id,
+                "codec": codec,
+                "blob": Binary(blob),
+                "archived_at": datetime.now(timezone.utc)
+            },
+            upsert=True
+        )
+
+    def get(self, conversation_id):
+        doc = self.archive_col.find_one({"_id": conversation_id}, {"blob": 1})
+        return bytes(doc["blob"]) if doc else None
+
+    def delete(self, conversation_id):
+        self.archive_col.delete_one({"_id": conversation_id})
+
+class FileArchiveStore:
+    """Compressed message blobs on local disk, one file per conversation"""
+    name = "file"
+
+    def __init__(self, root=None):
+        self.root = root or Config.ARCHIVE_DIR
+
+    def _path(self, conversation_id):
+        key = str(conversation_id)
+        # Shard by id prefix so no single directory grows without bound
+        return os.path.join(self.root, key[:4], f"{key}.bin")
+
+    def put(self, conversation_id, user_id, blob, codec):
+        path = self._path(conversation_id)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(blob)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+    def get(self, conversation_id):
+        try:
+            with open(self._path(conversation_id), "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def delete(self, conversation_id):
+        try:
+            os.remove(self._path(conversation_id))
+        except FileNotFoundError:
+            pass
+
+ARCHIVE_STORES = {
+    MongoArchiveStore.name: MongoArchiveStore,
+    FileArchiveStore.name: FileArchiveStore
+}
+
+class ConversationArchiveModel:
+    def __init__(self, store_name=None):
+        self.stores = {}
+        self.default_store = store_name or Config.ARCHIVE_STORE
+
+    def store(self, name=None):
+        name = name or self.default_store
+        if name not in self.stores:
+            self.stores[name] = ARCHIVE_STORES[name]()
+        return self.stores[name]
+
+    def archive_messages(self, conversation_id, user_id, messages):
+        """Write compressed messages to cold storage; returns the stub fields to keep inline"""
+        codec = default_codec()
+        store = self.store()
+        store.put(conversation_id, user_id, compress_messages(messages, codec), codec)
+        return {
+            "archived": True,
+            "archived_at": datetime.now(timezone.utc),
+            "archive_store": store.name,
+            "archive_codec": codec,
+            "message_count": len(messages)
+        }
+
+    def load_messages(self, conversation):
+        """Rehydrate the messages of an archived conversation stub"""
+        blob = self.store(conversation.get("archive_store")).get(conversation["_id"])
+        if blob is None:
+            logger.error(f"Archived messages missing for conversation {conversation['_id']}")
+            return []
+        return decompress_messages(blob, conversation.get("archive_codec", "zlib"))
+
+    def delete_messages(self, conversation):
+        self.store(conversation.get("archive_store")).delete(conversation["_id"])
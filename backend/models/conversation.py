@@ -1,19 +1,45 @@
-from pymongo import MongoClient
+from pymongo import ASCENDING, DESCENDING
 from datetime import datetime, timezone
+from threading import Lock
 from config import Config
+from models.database import get_client
+from models.user_profile import UserProfileModel, is_usable_summary
+from models.archive import ConversationArchiveModel
+import time
 import logging
 
 logger = logging.getLogger(__name__)
 
+_indexes_ensured = False
+_indexes_lock = Lock()
+
 class ConversationModel:
     def __init__(self):
-        self.client = MongoClient(Config.MONGODB_URI)
+        self.client = get_client()
         self.db = self.client.get_database(Config.DATABASE_NAME)
         self.conversations_col = self.db["conversations"]
+        self.user_profiles = UserProfileModel(self.db)
+        self.archive = ConversationArchiveModel()
+
+    def ensure_indexes(self):
+        """Create the conversation indexes once per process (called from warmup and CLI jobs, never per request)"""
+        global _indexes_ensured
+        if _indexes_ensured:
+            return
+        with _indexes_lock:
+            if _indexes_ensured:
+                return
+            try:
+                self.conversations_col.create_index([("user_id", ASCENDING), ("timestamp", DESCENDING)])
+                self.conversations_col.create_index("topics")
+                self.conversations_col.create_index("timestamp")  # archival scans by age
+                _indexes_ensured = True
+            except Exception as e:
+                logger.error(f"Failed to ensure conversation indexes: {str(e)}")
     
     def save_conversation(self, user_id, messages, summary, topics, 
                          is_start=False, is_end=False):
-        """Save a conversation to the database"""
+        """Save a conversation to the database (topics is a list of strings)"""
         try:
             conversation = {
                 "user_id": user_id,
@@ -29,6 +55,12 @@ class ConversationModel:
             }
             
             result = self.conversations_col.insert_one(conversation)
+            if is_end:
+                self.user_profiles.record_conversation(
+                    user_id, summary, topics, len(messages), conversation["timestamp"]
+                )
+            else:
+                self.user_profiles.touch(user_id)
             logger.info(f"Saved conversation for {user_id} (Start: {is_start}, End: {is_end})")
             return result.inserted_id
             
@@ -38,37 +70,100 @@ class ConversationModel:
     
     def get_user_context(self, user_id, limit=3):
         """Get recent conversation context for a user"""
+        profile = self.get_last_summary(user_id)
+        if profile is not None:
+            return profile
         try:
+            # No materialized profile yet, fall back to the raw summaries
             conversations = self.conversations_col.find(
                 {"user_id": user_id},
                 {"summary": 1, "_id": 0},
                 sort=[("timestamp", -1)],
                 limit=limit
             )
-            return "\n".join([doc.get("summary", "") for doc in conversations])
+            return "\n".join([doc["summary"] for doc in conversations if is_usable_summary(doc.get("summary"))])
         except Exception as e:
             logger.error(f"Failed to get context for {user_id}: {str(e)}")
             return ""
     
-    def get_last_conversation(self, user_id):
-        """Get the most recent conversation for a user"""
+    def get_last_conversation(self, user_id, projection=None, rehydrate=False):
+        """Get the most recent conversation for a user; pass rehydrate=True when the messages are needed"""
         try:
-            return self.conversations_col.find_one(
+            conversation = self.conversations_col.find_one(
                 {"user_id": user_id},
+                projection,
                 sort=[("timestamp", -1)]
             )
+            return self.rehydrate(conversation) if rehydrate else conversation
         except Exception as e:
             logger.error(f"Failed to get last conversation for {user_id}: {str(e)}")
             return None
-    
-    def get_last_summary(self, user_id):
-        """Get the most recent summary/profile for a user"""
+
+    def get_conversation(self, conversation_id):
+        """Get one conversation by _id, with archived messages restored"""
         try:
-            self.get_user_context(user_id,1)
+            return self.rehydrate(self.conversations_col.find_one({"_id": conversation_id}))
         except Exception as e:
-            logger.error(f"Failed to get last summary for {user_id}: {str(e)}")
+            logger.error(f"Failed to get conversation {conversation_id}: {str(e)}")
             return None
 
+    def rehydrate(self, conversation):
+        """Fill in the messages of an archived stub from cold storage"""
+        if conversation and conversation.get("archived") and "messages" not in conversation:
+            conversation["messages"] = self.archive.load_messages(conversation)
+        return conversation
+
+    def iter_messages(self, batch_size=500):
+        """Yield (_id, messages) for every stored conversation, archived ones included"""
+        cursor = self.conversations_col.find(
+            {"$or": [{"messages.0": {"$exists": True}}, {"archived": True}]},
+            {"messages": 1, "archived": 1, "archive_store": 1, "archive_codec": 1}
+        ).batch_size(batch_size)
+        for doc in cursor:
+            yield doc["_id"], self.rehydrate(doc).get("messages", [])
+
+    def archive_conversation(self, conversation):
+        """Move a conversation's messages to cold storage, leaving a slim stub inline"""
+        stub = self.archive.archive_messages(
+            conversation["_id"], conversation.get("user_id"), conversation.get("messages", [])
+        )
+        # Only unset messages if nobody has archived or changed it meanwhile
+        result = self.conversations_col.update_one(
+            {"_id": conversation["_id"], "archived": {"$ne": True}},
+            {"$set": stub, "$unset": {"messages": ""}}
+        )
+        if result.modified_count == 0:
+            return False
+        # The stored shape changed, so cached /conversations responses are stale
+        self.user_profiles.touch(conversation.get("user_id"))
+        return True
+
+    def restore_conversation(self, conversation_id):
+        """Move an archived conversation's messages back inline"""
+        conversation = self.conversations_col.find_one({"_id": conversation_id})
+        if not conversation or not conversation.get("archived"):
+            return False
+        messages = self.archive.load_messages(conversation)
+        result = self.conversations_col.update_one(
+            {"_id": conversation_id, "archived": True},
+            {
+                "$set": {"messages": messages},
+                "$unset": {"archived": "", "archived_at": "", "archive_store": "", "archive_codec": "", "message_count": ""}
+            }
+        )
+        if result.modified_count == 0:
+            return False
+        self.archive.delete_messages(conversation)
+        self.user_profiles.touch(conversation.get("user_id"))
+        return True
+    
+    def get_last_summary(self, user_id):
+        """Get the most recent summary/profile for a user"""
+        profile = self.user_profiles.get_profile(user_id)
+        if profile and is_usable_summary(profile.get("latest_profile")):
+            return profile["latest_profile"]
+        return None
+
     def mark_conversation_ended(self, user_id, end_reason="manual"):
         """Mark the last active conversation as ended"""
         try:
@@ -92,6 +187,8 @@ class ConversationModel:
                     }
                 }
             )
+            if result.modified_count > 0:
+                self.user_profiles.touch(user_id)
             return result.modified_count > 0
         except Exception as e:
             logger.error(f"Failed to mark conversation ended for {user_id}: {str(e)}")
@@ -109,18 +206,26 @@ class ConversationModel:
             # If no active conversation found, that's okay
             if result.matched_count == 0:
                 logger.info(f"No active conversation found to update for {user_id}")
+            else:
+                self.user_profiles.touch(user_id)
                 
         except Exception as e:
             logger.error(f"Failed to update activity for {user_id}: {str(e)}")
 
     
     def get_conversations_by_user(self, user_id):
-        """Get all conversations for a user (excluding messages)"""
+        """Get all conversations for a user (excluding messages), archived or not"""
         try:
-            return list(self.conversations_col.find(
-                {"user_id": user_id},
-                {"_id": 0, "messages": 0}
-            ).sort("timestamp", -1))
+            return list(self.conversations_col.aggregate([
+                {"$match": {"user_id": user_id}},
+                {"$sort": {"timestamp": -1}},
+                # Archived stubs keep message_count; count inline messages without sending them
+                {"$set": {"message_count": {"$ifNull": ["$message_count", {"$size": {"$ifNull": ["$messages", []]}}]}}},
+                {"$project": {
+                    "_id": 0, "messages": 0,
+                    "archived": 0, "archived_at": 0, "archive_store": 0, "archive_codec": 0
+                }}
+            ]))
         except Exception as e:
             logger.error(f"Failed to get conversations for {user_id}: {str(e)}")
             return []
@@ -156,6 +261,7 @@ class ConversationModel:
                         }
                     }
                 )
+                self.user_profiles.touch(user_id)
                 logger.info(f"Updated session summary for conversation {recent_conversation['_id']}")
             else:
                 logger.warning(f"No conversation with conversation_end=True found for {user_id}")
@@ -167,11 +273,15 @@ class ConversationModel:
     def health_check(self):
         """Check database connection health"""
         try:
+            started = time.perf_counter()
             self.client.admin.command('ping')
+            ping_ms = (time.perf_counter() - started) * 1000
             return {
                 "status": "success",
                 "database": Config.DATABASE_NAME,
-                "conversations_count": self.conversations_col.count_documents({})
+                "ping_ms": round(ping_ms, 1),
+                # Metadata-based count: constant cost however large the collection grows
+                "conversations_count": self.conversations_col.estimated_document_count()
             }
         except Exception as e:
             return {"status": "error", "error": str(e)}
@@ -0,0 +1,79 @@
+from pymongo import MongoClient
+from pymongo.monitoring import ConnectionPoolListener
+from threading import Lock
+from config import Config
+import os
+import logging
+
+logger = logging.getLogger(__name__)
+
+class PoolStats(ConnectionPoolListener):
+    """Track checked-out connections per server so health checks can report pool saturation"""
+    def __init__(self):
+        self.lock = Lock()
+        self.checked_out = {}
+
+    def connection_checked_out(self, event):
+        with self.lock:
+            self.checked_out[event.address] = self.checked_out.get(event.address, 0) + 1
+
+    def connection_checked_in(self, event):
+        with self.lock:
+            self.checked_out[event.address] = max(0, self.checked_out.get(event.address, 0) - 1)
+
+    def pool_cleared(self, event):
+        with self.lock:
+            self.checked_out.pop(event.address, None)
+
+    def pool_closed(self, event):
+        self.pool_cleared(event)
+
+    def busiest(self):
+        """Highest number of connections checked out from any one server pool"""
+        with self.lock:
+            return max(self.checked_out.values(), default=0)
+
+    def pool_created(self, event): pass
+    def pool_ready(self, event): pass
+    def connection_created(self, event): pass
+    def connection_ready(self, event): pass
+    def connection_closed(self, event): pass
+    def connection_check_out_started(self, event): pass
+    def connection_check_out_failed(self, event): pass
+
+pool_stats = PoolStats()
+
+# One pooled client per process; rebuilt lazily after a fork
+_client = None
+_client_pid = None
+_client_lock = Lock()
+
+def get_client():
+    """Get the process-wide MongoClient, creating it on first use"""
+    global _client, _client_pid
+    if _client is not None and _client_pid == os.getpid():
+        return _client
+    with _client_lock:
+        if _client is None or _client_pid != os.getpid():
+            _client = MongoClient(
+                Config.MONGODB_URI,
+                maxPoolSize=Config.MONGO_MAX_POOL_SIZE,
+                event_listeners=[pool_stats]
+            )
+            _client_pid = os.getpid()
+            logger.info(f"Created MongoDB client for process {_client_pid}")
+    return _client
+
+def get_database():
+    """Get the application database from the shared client"""
+    return get_client().get_database(Config.DATABASE_NAME)
+
+def reset_client():
+    """Drop the inherited client in a forked worker so it builds its own pool"""
+    global _client, _client_pid
+    with _client_lock:
+        if _client is not None and _client_pid == os.getpid():
+            _client.close()
+        _client = None
+        _client_pid = None
+        pool_stats.checked_out.clear()
@@ -0,0 +1,60 @@
+from pymongo import UpdateOne
+from models.database import get_database
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Reserved _id holding the number of documents the IDF table was built from
+CORPUS_STATS_ID = "__corpus__"
+
+class TopicIndexModel:
+    def __init__(self):
+        self.db = get_database()
+        self.idf_col = self.db["topic_idf"]
+
+    def load_document_frequencies(self, terms=None):
+        """Load (doc_count, {term: df}) for the given terms, or the whole table when terms is None"""
+        try:
+            doc_count = 0
+            frequencies = {}
+            query = {} if terms is None else {"_id": {"$in": [CORPUS_STATS_ID, *terms]}}
+            for doc in self.idf_col.find(query):
+                if doc["_id"] == CORPUS_STATS_ID:
+                    doc_count = doc.get("doc_count", 0)
+                else:
+                    frequencies[doc["_id"]] = doc.get("df", 0)
+            return doc_count, frequencies
+        except Exception as e:
+            logger.error(f"Failed to load topic IDF table: {str(e)}")
+            return 0, {}
+
+    def increment_document_frequencies(self, terms, documents=1):
+        """Incrementally add documents containing the given distinct terms"""
+        try:
+            operations = [
+                UpdateOne({"_id": term}, {"$inc": {"df": 1}}, upsert=True)
+                for term in terms
+            ]
+            operations.append(
+                UpdateOne({"_id": CORPUS_STATS_ID}, {"$inc": {"doc_count": documents}}, upsert=True)
+            )
+            self.idf_col.bulk_write(operations, ordered=False)
+        except Exception as e:
+            logger.error(f"Failed to update topic IDF table: {str(e)}")
+
+    def replace_document_frequencies(self, doc_count, frequencies, batch_size=1000):
+        """Replace the whole IDF table, used when rebuilding from stored conversations"""
+        try:
+            self.idf_col.delete_many({})
+            batch = [{"_id": CORPUS_STATS_ID, "doc_count": doc_count}]
+            for term, df in frequencies.items():
+                batch.append({"_id": term, "df": df})
+                if len(batch) >= batch_size:
+                    self.idf_col.insert_many(batch, ordered=False)
+                    batch = []
+            if batch:
+                self.idf_col.insert_many(batch, ordered=False)
+            logger.info(f"Rebuilt topic IDF table: {len(frequencies)} terms over {doc_count} conversations")
+        except Exception as e:
+            logger.error(f"Failed to rebuild topic IDF table: {str(e)}")
+            raise
@@ -0,0 +1,179 @@
+from datetime import datetime, timezone
+from threading import Lock
+from config import Config
+from models.database import get_database
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Short-lived per-process cache of (version, updated_at) stamps for conditional GETs
+_version_cache = {}
+_version_lock = Lock()
+
+# Older releases stored this placeholder as the summary when the LLM call failed
+FAILED_SUMMARY = "Summary generation failed"
+
+def is_usable_summary(summary):
+    return isinstance(summary, str) and summary.strip() != "" and summary != FAILED_SUMMARY
+
+def _topic_key(topic):
+    """Make a topic safe to use as a field name under topic_counts"""
+    return topic.replace(".", "_").replace("$", "_")
+
+class UserProfileModel:
+    def __init__(self, db=None):
+        self.db = db if db is not None else get_database()
+        self.profiles_col = self.db["user_profiles"]
+        # Version stamps live apart from profiles so bumping one never creates a bare profile
+        self.versions_col = self.db["user_versions"]
+        self.conversations_col = self.db["conversations"]
+
+    def record_conversation(self, user_id, summary, topics, message_count, timestamp=None):
+        """Fold one saved conversation into the user's materialized profile"""
+        try:
+            timestamp = timestamp or datetime.now(timezone.utc)
+            update = {
+                "$set": {"updated_at": datetime.now(timezone.utc)},
+                "$inc": {"session_count": 1, "total_messages": message_count},
+                "$max": {"last_active": timestamp}
+            }
+            if isinstance(topics, list):
+                for topic in topics:
+                    update["$inc"][f"topic_counts.{_topic_key(topic)}"] = 1
+            # A failed summary still counts as a session but keeps the previous profile text
+            if is_usable_summary(summary):
+                update["$set"]["latest_profile"] = summary
+
+            self.profiles_col.update_one({"_id": user_id}, update, upsert=True)
+        except Exception as e:
+            logger.error(f"Failed to update profile for {user_id}: {str(e)}")
+        finally:
+            self.touch(user_id)
+
+    def touch(self, user_id):
+        """Bump the user's version stamp after any change to their conversations"""
+        try:
+            self.versions_col.update_one(
+                {"_id": user_id},
+                {"$inc": {"version": 1}, "$set": {"updated_at": datetime.now(timezone.utc)}},
+                upsert=True
+            )
+        except Exception as e:
+            logger.error(f"Failed to bump version for {user_id}: {str(e)}")
+        finally:
+            self._forget_version(user_id)
+
+    def touch_all(self):
+        """Bump the version stamp of every user with stored conversations, after bulk rewrites"""
+        self.conversations_col.aggregate([
+            {"$match": {"user_id": {"$ne": None}}},
+            {"$group": {"_id": "$user_id"}},
+            {"$set": {"version": 1, "updated_at": "$$NOW"}},
+            {"$merge": {
+                "into": "user_versions",
+                "whenMatched": [{"$set": {
+                    "version": {"$add": [{"$ifNull": ["$version", 0]}, 1]},
+                    "updated_at": "$$NOW"
+                }}],
+                "whenNotMatched": "insert"
+            }}
+        ])
+        with _version_lock:
+            _version_cache.clear()
+
+    def get_version(self, user_id):
+        """Get (version, updated_at) for a user, cached for USER_VERSION_CACHE_SECONDS"""
+        now = time.monotonic()
+        with _version_lock:
+            cached = _version_cache.get(user_id)
+            if cached and now - cached[2] < Config.USER_VERSION_CACHE_SECONDS:
+                return cached[0], cached[1]
+
+        doc = self.versions_col.find_one({"_id": user_id})
+        version = doc.get("version", 0) if doc else 0
+        updated_at = doc.get("updated_at") if doc else None
+        with _version_lock:
+            _version_cache[user_id] = (version, updated_at, now)
+        return version, updated_at
+
+    def _forget_version(self, user_id):
+        with _version_lock:
+            _version_cache.pop(user_id, None)
+
+    def get_profile(self, user_id):
+        """Get the materialized profile for a user"""
+        try:
+            return self.profiles_col.find_one({"_id": user_id})
+        except Exception as e:
+            logger.error(f"Failed to get profile for {user_id}: {str(e)}")
+            return None
+
+    def rebuild(self, user_id=None):
+        """Recompute profiles from stored conversations with aggregation pipelines"""
+        match = {"conversation_end": True}
+        if user_id is not None:
+            match["user_id"] = user_id
+            self.profiles_col.delete_one({"_id": user_id})
+        else:
+            self.profiles_col.delete_many({})
+
+        # Session stats
+        self.conversations_col.aggregate([
+            {"$match": match},
+            {"$group": {
+                "_id": "$user_id",
+                "session_count": {"$sum": 1},
+                # Archived stubs keep message_count in place of the messages array
+                "total_messages": {"$sum": {"$ifNull": ["$message_count", {"$size": {"$ifNull": ["$messages", []]}}]}},
+                "last_active": {"$max": "$timestamp"}
+            }},
+            {"$set": {"updated_at": "$$NOW", "topic_counts": {"$literal": {}}}},
+            {"$merge": {"into": "user_profiles", "whenMatched": "replace", "whenNotMatched": "insert"}}
+        ])
+
+        # Latest profile text, skipping failed or missing summaries
+        self.conversations_col.aggregate([
+            {"$match": {**match, "summary": {"$type": "string", "$nin": [FAILED_SUMMARY, ""]}}},
+            {"$sort": {"timestamp": 1}},
+            {"$group": {"_id": "$user_id", "latest_profile": {"$last": "$summary"}}},
+            {"$merge": {"into": "user_profiles", "whenMatched": "merge", "whenNotMatched": "discard"}}
+        ])
+
+        # Topic frequencies (conversations with legacy string topics are skipped)
+        self.conversations_col.aggregate([
+            {"$match": {**match, "topics": {"$type": "array"}}},
+            {"$unwind": "$topics"},
+            {"$group": {
+                "_id": {
+                    "user_id": "$user_id",
+                    "topic": {"$replaceAll": {
+                        "input": {"$replaceAll": {"input": "$topics", "find": ".", "replacement": "_"}},
+                        "find": {"$literal": "$"}, "replacement": "_"
+                    }}
+                },
+                "count": {"$sum": 1}
+            }},
+            {"$group": {
+                "_id": "$_id.user_id",
+                "topic_counts": {"$push": {"k": "$_id.topic", "v": "$count"}}
+            }},
+            {"$project": {"topic_counts": {"$arrayToObject": "$topic_counts"}}},
+            {"$merge": {"into": "user_profiles", "whenMatched": "merge", "whenNotMatched": "discard"}}
+        ])
+
+        # Cached responses built from the old profiles must not be answered with 304
+        if user_id is not None:
+            self.touch(user_id)
+        else:
+            self.touch_all()
+        rebuilt = self.profiles_col.count_documents({} if user_id is None else {"_id": user_id})
+        logger.info(f"Rebuilt {rebuilt} user profiles")
+        return rebuilt
+
+
+if __name__ == "__main__":
+    # Backfill: python -m models.user_profile
+    from utils.logging_config import setup_logging
+    setup_logging()
+    UserProfileModel().rebuild()
@@ -0,0 +1,42 @@
+from flask import Blueprint, request, jsonify, Response, stream_with_context
+from bson.errors import InvalidId
+from services.export_service import ExportService, parse_date
+from utils.admin import admin_required
+import logging
+
+logger = logging.getLogger(__name__)
+
+admin_bp = Blueprint('admin', __name__)
+
+@admin_bp.route("/admin/export", methods=["GET"])
+#Whole collection: /admin/export
+#Time range, resuming after the last _id received: /admin/export?start=2025-01-01&end=2025-02-01&after_id=...
+@admin_required
+def export_conversations():
+    """Stream conversations as gzip-compressed NDJSON in _id order"""
+    try:
+        filters = {
+            "start": parse_date(request.args.get("start")),
+            "end": parse_date(request.args.get("end")),
+            "after_id": request.args.get("after_id")
+        }
+        export_service = ExportService()
+        stream = export_service.stream_ndjson_gzip(**filters)
+        # Pull the first chunk now so bad filters fail with a 400 instead of a broken stream
+        first_chunk = next(stream)
+    except (ValueError, InvalidId) as e:
+        return jsonify({"error": f"Invalid export filter: {str(e)}"}), 400
+    except Exception as e:
+        logger.error(f"Export failed to start: {str(e)}")
+        return jsonify({"error": "Export failed"}), 500
+
+    def generate():
+        yield first_chunk
+        yield from stream
+
+    logger.info(f"Streaming export with filters {filters}")
+    return Response(
+        stream_with_context(generate()),
+        mimetype="application/gzip",
+        headers={"Content-Disposition": "attachment; filename=conversations.ndjson.gz"}
+    )
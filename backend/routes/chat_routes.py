@@ -1,4 +1,4 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, g
 from services.conversation_service import ConversationService
 from services.ai_service import AIService
 from models.conversation import ConversationModel
@@ -70,7 +70,9 @@ def chat():
         user_message = data["message"].strip()
         force_start = data.get("force_start", False)
         
-        logger.info(f"💬 New message from {user_id}: {user_message}")
+        g.user_id = user_id
+        logger.info("💬 New message from %s (%d chars)", user_id, len(user_message))
+        logger.debug("Message from %s: %s", user_id, user_message)
         
         # Check if conversation is already active
         conversation_already_active = is_conversation_active(user_id)
@@ -103,18 +105,19 @@ def chat():
         # Override start detection if conversation is already active
         if conversation_already_active and not force_start:
             result["is_start"] = False
-            logger.info(f"Overriding start detection - conversation already active for {user_id}")
+            logger.info("Overriding start detection - conversation already active for %s", user_id)
         
         # Add messages to ongoing session
         add_message_to_session(user_id, result["conversation_data"])
         
         # When conversation ends, just clear session
         if result["is_end"]:
-            logger.info(f"🔚 CONVERSATION ENDED for user {user_id}")
+            logger.info("🔚 CONVERSATION ENDED for user %s", user_id)
             clear_session_messages(user_id)
         else:
-            session_message_count = len(get_session_messages(user_id))
-            logger.info(f"💬 Message exchanged for user {user_id} (conversation ongoing - {session_message_count} messages in session)")
+            if logger.isEnabledFor(logging.INFO):
+                logger.info("💬 Message exchanged for user %s (conversation ongoing - %d messages in session)",
+                            user_id, len(get_session_messages(user_id)))
         
         # Prepare response
         response_data = {"response": result["response"]}
@@ -122,7 +125,7 @@ def chat():
             response_data["conversation_ended"] = True
         if result["is_start"] and not conversation_already_active:
             response_data["conversation_started"] = True
-            logger.info(f"🆕 NEW CONVERSATION STARTED for user {user_id}")
+            logger.info("🆕 NEW CONVERSATION STARTED for user %s", user_id)
             
         return jsonify(response_data)
 
@@ -1,6 +1,9 @@
 from flask import Blueprint, request, jsonify
 from models.conversation import ConversationModel
+from models.user_profile import UserProfileModel
 from services.ai_service import AIService
+from services.topic_service import TopicService
+from utils.http_cache import conditional_user_get
 from concurrent.futures import ThreadPoolExecutor
 import logging
 
@@ -32,9 +35,10 @@ def end_conversation():
         from routes.chat_routes import get_session_messages
         messages = get_session_messages(user_id)
         
+        conversation_model = ConversationModel()
         if not messages:
             # Try to get messages from last incomplete conversation
-            last_conv = conversation_model.get_last_conversation(user_id)
+            last_conv = conversation_model.get_last_conversation(user_id, rehydrate=True)
             if last_conv and not last_conv.get("conversation_complete"):
                 messages = last_conv.get("messages", [])
             
@@ -48,11 +52,10 @@ def end_conversation():
                     }
                 }), 400
             
-        conversation_model = ConversationModel()
         ai_service = AIService()
         
         # Generate comprehensive summary        
-        summary = ai_service.generate_summary(messages, conversation_model.get_last_summary)
+        summary = ai_service.generate_summary(messages, conversation_model.get_last_summary(user_id) or "")
         topics = ai_service.extract_topics(messages)
         
         # Save complete conversation
@@ -64,6 +67,8 @@ def end_conversation():
             is_start=False,
             is_end=True
         )
+        # Hundreds of upserts, nothing in the response depends on them
+        executor.submit(TopicService().update_idf, messages)
         
         logger.info(f"🔚 CONVERSATION SAVED: User {user_id}")
         logger.info(f"📝 End reason: {end_reason}")
@@ -106,11 +111,15 @@ def auto_save():
         return jsonify({"error": "Auto-save failed"}), 500
 
 @conversation_bp.route("/api/conversation-status/<user_id>", methods=["GET"])
+@conditional_user_get
 def get_conversation_status(user_id):
     """Check if user has an active conversation"""
     try:
         conversation_model = ConversationModel()
-        last_conversation = conversation_model.get_last_conversation(user_id)
+        # Status only needs two fields, never the (possibly archived) messages
+        last_conversation = conversation_model.get_last_conversation(
+            user_id, {"conversation_complete": 1, "timestamp": 1}
+        )
         
         if not last_conversation:
             return jsonify({"active": False, "new_conversation": True})
@@ -132,6 +141,7 @@ def get_conversation_status(user_id):
 @conversation_bp.route("/conversations/<user_id>", methods=["GET"])
 #Raw data: /conversations/2
 #Summary: /conversations/2?summary=true
+@conditional_user_get
 def get_conversations(user_id):
     """Get stored conversations for a user (raw or summary)"""
     try:
@@ -145,10 +155,10 @@ def get_conversations(user_id):
             for conv in conversations:
                 formatted.append({
                     'timestamp': conv['timestamp'].isoformat(),
-                    'summary': conv.get('summary', 'No summary'),
+                    'summary': conv.get('summary') or 'No summary',
                     'topics': conv.get('topics', []),
                     'complete': conv.get('conversation_complete', False),
-                    'message_count': len(conv.get('messages', []))
+                    'message_count': conv.get('message_count', 0)
                 })
             return jsonify({
                 'user_id': user_id,
@@ -160,3 +170,25 @@ def get_conversations(user_id):
     except Exception as e:
         logger.error(f"Error getting conversations: {str(e)}")
         return jsonify({"error": str(e)}), 500
+
+@conversation_bp.route("/api/user-profile/<user_id>", methods=["GET"])
+@conditional_user_get
+def get_user_profile(user_id):
+    """Get the materialized profile and topic analytics for a user"""
+    try:
+        profile = UserProfileModel().get_profile(user_id)
+        if not profile:
+            return jsonify({"error": "Profile not found"}), 404
+
+        topic_counts = profile.get("topic_counts", {})
+        return jsonify({
+            "user_id": user_id,
+            "latest_profile": profile.get("latest_profile"),
+            "session_count": profile.get("session_count", 0),
+            "total_messages": profile.get("total_messages", 0),
+            "last_active": profile["last_active"].isoformat() if profile.get("last_active") else None,
+            "topic_counts": dict(sorted(topic_counts.items(), key=lambda item: -item[1]))
+        })
+    except Exception as e:
+        logger.error(f"Error getting user profile: {str(e)}")
+        return jsonify({"error": "Profile lookup failed"}), 500
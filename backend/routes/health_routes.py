@@ -1,5 +1,5 @@
 from flask import Blueprint, jsonify
-from models.conversation import ConversationModel
+from services.health_service import health_monitor
 import logging
 
 logger = logging.getLogger(__name__)
@@ -8,21 +8,35 @@ health_bp = Blueprint('health', __name__)
 
 @health_bp.route("/test-db", methods=["GET", "OPTIONS"])
 def test_db():
-    """Database health check endpoint"""
-    try:
-        conversation_model = ConversationModel()
-        health_status = conversation_model.health_check()
-        
-        if health_status["status"] == "success":
-            return jsonify(health_status)
-        else:
-            return jsonify(health_status), 500
-            
-    except Exception as e:
-        logger.error(f"Health check failed: {str(e)}")
-        return jsonify({"status": "error", "error": str(e)}), 500
+    """Database health check endpoint (served from the cached snapshot)"""
+    health_monitor.start()
+    snapshot = health_monitor.get_snapshot()
+    if snapshot is None:
+        return jsonify({"status": "error", "error": "Health snapshot not ready"}), 503
+
+    health_status = {**snapshot["mongo"], "age_seconds": snapshot["age_seconds"]}
+    if health_status["status"] == "success":
+        return jsonify(health_status)
+    else:
+        return jsonify(health_status), 500
 
 @health_bp.route("/health", methods=["GET", "OPTIONS"])
 def health():
     """General health check"""
     return jsonify({"status": "healthy", "service": "kids_chat_api"})
+
+@health_bp.route("/livez", methods=["GET"])
+def liveness():
+    """Liveness probe: the process is serving requests, no I/O"""
+    return jsonify({"status": "alive"})
+
+@health_bp.route("/readyz", methods=["GET"])
+def readiness():
+    """Readiness probe: the last background snapshot is fresh and Mongo is reachable"""
+    health_monitor.start()
+    snapshot = health_monitor.get_snapshot()
+    if snapshot is None:
+        return jsonify({"status": "starting"}), 503
+    if not health_monitor.is_ready(snapshot):
+        return jsonify(snapshot), 503
+    return jsonify(snapshot)
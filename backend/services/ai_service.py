@@ -1,14 +1,53 @@
 import requests
+from requests.adapters import HTTPAdapter
+from threading import Lock
 from config import Config
+from services.topic_service import TopicService, messages_to_text
+from utils.traffic_capture import record_llm_call
+import os
+import time
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Keep-alive connection pool to the AI API, shared by all AIService instances in a process
+_session = None
+_session_pid = None
+_session_lock = Lock()
+
+# Number of AI API calls currently waiting on a pooled connection or response
+_in_flight = 0
+_in_flight_lock = Lock()
+
+def ai_requests_in_flight():
+    return _in_flight
+
+def get_http_session():
+    """Get the process-wide pooled HTTP session, creating it on first use"""
+    global _session, _session_pid
+    with _session_lock:
+        if _session is None or _session_pid != os.getpid():
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=Config.HTTP_POOL_SIZE)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _session = session
+            _session_pid = os.getpid()
+        return _session
+
+def reset_http_session():
+    """Drop the inherited session in a forked worker so it opens its own sockets"""
+    global _session, _session_pid
+    with _session_lock:
+        _session = None
+        _session_pid = None
+
 class AIService:
     def __init__(self):
         self.api_url = Config.DEEPSEEK_API_URL
         self.api_key = Config.DEEPSEEK_API_KEY
         self.headers = {"Authorization": f"Bearer {self.api_key}"}
+        self.session = get_http_session()
     
     def get_chat_response(self, messages, timeout=30):
         """Get response from AI API"""
@@ -20,18 +59,28 @@ class AIService:
             
             
             
-            response = requests.post(
-                self.api_url,
-                headers=self.headers,
-                json=payload,
-                timeout=timeout
-            )
+            global _in_flight
+            with _in_flight_lock:
+                _in_flight += 1
+            started = time.perf_counter()
+            try:
+                response = self.session.post(
+                    self.api_url,
+                    headers=self.headers,
+                    json=payload,
+                    timeout=timeout
+                )
+            finally:
+                with _in_flight_lock:
+                    _in_flight -= 1
             
             if response.status_code != 200:
                 logger.error(f"AI API error: {response.status_code} - {response.text}")
                 raise Exception(f"AI API error: {response.status_code}")
             
-            return response.json()["choices"][0]["message"]["content"]
+            content = response.json()["choices"][0]["message"]["content"]
+            record_llm_call((time.perf_counter() - started) * 1000, len(content))
+            return content
             
         except requests.exceptions.Timeout:
             logger.warning("AI API timeout")
@@ -41,7 +90,7 @@ class AIService:
             raise
     
     def generate_summary(self, conversation_text, previous_profile=""):
-        """Generate conversation summary"""
+        """Generate conversation summary, or None if the AI call failed"""
         try:
             prompt = Config.SUMMARY_PROMPT.format(conversation_text=conversation_text, previous_profile=previous_profile)
             
@@ -54,22 +103,36 @@ class AIService:
             
         except Exception as e:
             logger.error(f"Summary generation failed: {str(e)}")
-            return "Summary generation failed"
+            return None
         
     def extract_topics(self, conversation_text):
-        """Generate topics"""
-        try:
-            prompt = Config.TOPICS_PROMPT.format(conversation_text=conversation_text)
-            
-            messages = [{
-                "role": "user",
-                "content": prompt
-            }]
-            
-            return self.get_chat_response(messages, timeout=30)
-            
-        except Exception as e:
-            logger.error(f"Topics generation failed: {str(e)}")
-            return "Topics generation failed"        
-            
-    
+        """Extract ranked topics locally, asking the AI only when confidence is low"""
+        topic_service = TopicService()
+        result = topic_service.extract(conversation_text)
+        topics = result["topics"]
+
+        if Config.TOPIC_LLM_REFINEMENT and result["confidence"] < Config.TOPIC_CONFIDENCE_THRESHOLD:
+            try:
+                refined = self.refine_topics(conversation_text, topics)
+                if refined:
+                    return refined
+            except Exception as e:
+                logger.error(f"Topics refinement failed: {str(e)}")
+
+        return topics
+
+    def refine_topics(self, conversation_text, candidates):
+        """Ask the AI for topics, seeded with the locally extracted candidates"""
+        prompt = Config.TOPICS_PROMPT.format(
+            conversation_text=messages_to_text(conversation_text),
+            candidates=", ".join(candidates) or "none"
+        )
+
+        messages = [{
+            "role": "user",
+            "content": prompt
+        }]
+
+        response = self.get_chat_response(messages, timeout=Config.TIMEOUT_PROFILE["simple"])
+        topics = [topic.strip().strip(".").lower() for topic in response.split(",")]
+        return [topic for topic in topics if topic][:Config.TOPIC_MAX_TOPICS]
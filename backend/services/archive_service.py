@@ -0,0 +1,49 @@
+from datetime import datetime, timedelta, timezone
+from config import Config
+from models.conversation import ConversationModel
+import sys
+import logging
+
+logger = logging.getLogger(__name__)
+
+class ArchiveService:
+    def __init__(self, conversation_model=None):
+        self.conversation_model = conversation_model or ConversationModel()
+
+    def archive_older_than(self, days=None, batch_size=200, limit=None):
+        """Move messages of completed conversations older than `days` to cold storage"""
+        days = Config.ARCHIVE_AFTER_DAYS if days is None else days
+        cutoff = datetime.now(timezone.utc) - timedelta(days=days)
+        cursor = self.conversation_model.conversations_col.find(
+            {
+                "timestamp": {"$lt": cutoff},
+                "conversation_complete": True,
+                "archived": {"$ne": True},
+                "messages": {"$exists": True}
+            },
+            {"user_id": 1, "messages": 1}
+        ).sort("timestamp", 1).batch_size(batch_size)
+        if limit:
+            cursor = cursor.limit(limit)
+
+        archived = 0
+        failed = 0
+        for conversation in cursor:
+            try:
+                if self.conversation_model.archive_conversation(conversation):
+                    archived += 1
+            except Exception as e:
+                failed += 1
+                logger.error(f"Failed to archive conversation {conversation['_id']}: {str(e)}")
+
+        logger.info(f"Archived {archived} conversations older than {days} days ({failed} failed)")
+        return {"archived": archived, "failed": failed, "cutoff": cutoff.isoformat()}
+
+
+if __name__ == "__main__":
+    # Archive job: python -m services.archive_service [days]
+    from utils.logging_config import setup_logging
+    setup_logging()
+    service = ArchiveService()
+    service.conversation_model.ensure_indexes()
+    service.archive_older_than(int(sys.argv[1]) if len(sys.argv) > 1 else None)
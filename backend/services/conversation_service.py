@@ -15,7 +15,7 @@ class ConversationService:
         try:
             # Start if forced by new conversation button
             if force_start:
-                logger.info(f"New conversation forced for {user_id}")
+                logger.info("New conversation forced for %s", user_id)
                 self.conversation_start_times[user_id] = datetime.utcnow()
                 return True
 
@@ -26,11 +26,11 @@ class ConversationService:
 
             # Start if no active conversation
             if active_conversation is None:
-                logger.info(f"No active conversation found for {user_id} - starting new one")
+                logger.info("No active conversation found for %s - starting new one", user_id)
                 self.conversation_start_times[user_id] = datetime.utcnow()
                 return True
             else:
-                logger.info(f"Active conversation exists for {user_id} - continuing")
+                logger.info("Active conversation exists for %s - continuing", user_id)
                 return False
 
         except Exception as e:
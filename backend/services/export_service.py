@@ -0,0 +1,236 @@
+from bson import ObjectId
+from datetime import datetime, timezone
+from pymongo import ReadPreference
+from config import Config
+from models.conversation import ConversationModel
+import argparse
+import gzip
+import json
+import os
+import zlib
+import logging
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:  # Parquet output is optional
+    pyarrow = None
+
+logger = logging.getLogger(__name__)
+
+EXPORT_FIELDS = [
+    "_id", "user_id", "timestamp", "summary", "topics", "conversation_start", "conversation_end",
+    "conversation_complete", "ended_at", "end_reason", "last_activity", "session_summary",
+    "message_count", "messages"
+]
+
+def _json_default(value):
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+def _parquet_schema():
+    timestamp = pyarrow.timestamp("us", tz="UTC")
+    return pyarrow.schema([
+        ("_id", pyarrow.string()),
+        ("user_id", pyarrow.string()),
+        ("timestamp", timestamp),
+        ("summary", pyarrow.string()),
+        ("topics", pyarrow.list_(pyarrow.string())),
+        ("conversation_start", pyarrow.bool_()),
+        ("conversation_end", pyarrow.bool_()),
+        ("conversation_complete", pyarrow.bool_()),
+        ("ended_at", timestamp),
+        ("end_reason", pyarrow.string()),
+        ("last_activity", timestamp),
+        ("session_summary", pyarrow.string()),
+        ("message_count", pyarrow.int64()),
+        ("messages", pyarrow.list_(pyarrow.struct([("sender", pyarrow.string()), ("text", pyarrow.string())])))
+    ])
+
+def _utc(value):
+    if isinstance(value, datetime) and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+def _parquet_row(doc):
+    """Coerce a conversation into the fixed Parquet schema"""
+    topics = doc.get("topics")
+    if isinstance(topics, str):
+        topics = [topics]  # legacy comma-separated string
+    messages = doc.get("messages") or []
+    return {
+        "_id": str(doc["_id"]),
+        "user_id": None if doc.get("user_id") is None else str(doc["user_id"]),
+        "timestamp": _utc(doc.get("timestamp")),
+        "summary": doc.get("summary"),
+        "topics": topics,
+        "conversation_start": doc.get("conversation_start"),
+        "conversation_end": doc.get("conversation_end"),
+        "conversation_complete": doc.get("conversation_complete"),
+        "ended_at": _utc(doc.get("ended_at")),
+        "end_reason": doc.get("end_reason"),
+        "last_activity": _utc(doc.get("last_activity")),
+        "session_summary": doc.get("session_summary"),
+        "message_count": doc.get("message_count", len(messages)),
+        "messages": [{"sender": m.get("sender"), "text": m.get("text")} for m in messages]
+    }
+
+class ExportService:
+    def __init__(self, conversation_model=None):
+        self.conversation_model = conversation_model or ConversationModel()
+        # Prefer a secondary so long exports don't compete with the API for the primary
+        self.export_col = self.conversation_model.conversations_col.with_options(
+            read_preference=ReadPreference.SECONDARY_PREFERRED
+        )
+
+    def iter_conversations(self, start=None, end=None, after_id=None, batch_size=None):
+        """Stream conversations in _id order from a batched cursor, rehydrating archived ones"""
+        query = {}
+        if start or end:
+            query["timestamp"] = {}
+            if start:
+                query["timestamp"]["$gte"] = start
+            if end:
+                query["timestamp"]["$lt"] = end
+        if after_id:
+            query["_id"] = {"$gt": ObjectId(after_id) if isinstance(after_id, str) else after_id}
+
+        # Without the hint the planner may pick the timestamp index and add a blocking in-memory sort
+        cursor = (self.export_col.find(query)
+                  .sort("_id", 1)
+                  .hint([("_id", 1)])
+                  .batch_size(batch_size or Config.EXPORT_BATCH_SIZE))
+        for doc in cursor:
+            yield self.conversation_model.rehydrate(doc)
+
+    def to_ndjson_line(self, doc):
+        return json.dumps({field: doc[field] for field in EXPORT_FIELDS if field in doc},
+                          ensure_ascii=False, default=_json_default) + "\n"
+
+    def stream_ndjson_gzip(self, **filters):
+        """Yield a gzip stream of NDJSON chunks, for the admin endpoint"""
+        compressor = zlib.compressobj(Config.EXPORT_GZIP_LEVEL, zlib.DEFLATED, 31)
+        buffer = []
+        for doc in self.iter_conversations(**filters):
+            buffer.append(self.to_ndjson_line(doc))
+            if len(buffer) >= Config.EXPORT_BATCH_SIZE:
+                chunk = compressor.compress("".join(buffer).encode("utf-8"))
+                buffer = []
+                if chunk:
+                    yield chunk
+        if buffer:
+            yield compressor.compress("".join(buffer).encode("utf-8"))
+        yield compressor.flush()
+
+    def export_to_directory(self, output_dir, fmt="ndjson", start=None, end=None,
+                            batch_size=None, part_size=None):
+        """Write numbered part files and a checkpoint; rerunning resumes after the last finished part"""
+        if fmt == "parquet" and pyarrow is None:
+            raise RuntimeError("Parquet export requires the pyarrow package")
+        batch_size = batch_size or Config.EXPORT_BATCH_SIZE
+        part_size = part_size or Config.EXPORT_PART_SIZE
+        os.makedirs(output_dir, exist_ok=True)
+
+        checkpoint_path = os.path.join(output_dir, "checkpoint.json")
+        export_filter = {
+            "format": fmt,
+            "start": start.isoformat() if start else None,
+            "end": end.isoformat() if end else None
+        }
+        checkpoint = {"last_id": None, "next_part": 0, "exported": 0, "filter": export_filter}
+        if os.path.exists(checkpoint_path):
+            with open(checkpoint_path) as f:
+                checkpoint = json.load(f)
+            if checkpoint.get("filter") != export_filter:
+                raise ValueError(f"{output_dir} holds an export with different options: {checkpoint.get('filter')}")
+            logger.info(f"Resuming export after _id {checkpoint['last_id']} (part {checkpoint['next_part']})")
+        for name in os.listdir(output_dir):
+            if name.endswith(".tmp"):
+                os.remove(os.path.join(output_dir, name))  # unfinished part from an interrupted run
+
+        documents = self.iter_conversations(start, end, checkpoint["last_id"], batch_size)
+        write_part = self._write_parquet_part if fmt == "parquet" else self._write_ndjson_part
+        extension = "parquet" if fmt == "parquet" else "ndjson.gz"
+        while True:
+            part_path = os.path.join(output_dir, f"part-{checkpoint['next_part']:05d}.{extension}")
+            count, last_id = write_part(f"{part_path}.tmp", documents, part_size, batch_size)
+            if count == 0:
+                os.remove(f"{part_path}.tmp")
+                break
+            os.replace(f"{part_path}.tmp", part_path)
+
+            checkpoint = {
+                "last_id": str(last_id),
+                "next_part": checkpoint["next_part"] + 1,
+                "exported": checkpoint["exported"] + count,
+                "filter": export_filter
+            }
+            with open(f"{checkpoint_path}.tmp", "w") as f:
+                json.dump(checkpoint, f)
+            os.replace(f"{checkpoint_path}.tmp", checkpoint_path)
+            logger.info(f"Exported {checkpoint['exported']} conversations ({part_path})")
+
+        return checkpoint
+
+    def _write_ndjson_part(self, path, documents, part_size, batch_size):
+        count = 0
+        last_id = None
+        with gzip.open(path, "wt", encoding="utf-8", compresslevel=Config.EXPORT_GZIP_LEVEL) as f:
+            for doc in documents:
+                f.write(self.to_ndjson_line(doc))
+                last_id = doc["_id"]
+                count += 1
+                if count >= part_size:
+                    break
+        return count, last_id
+
+    def _write_parquet_part(self, path, documents, part_size, batch_size):
+        schema = _parquet_schema()
+        count = 0
+        last_id = None
+        rows = []
+        with pyarrow.parquet.ParquetWriter(path, schema, compression="zstd") as writer:
+            for doc in documents:
+                rows.append(_parquet_row(doc))
+                last_id = doc["_id"]
+                count += 1
+                # One row group per batch keeps memory bounded by batch_size
+                if len(rows) >= batch_size:
+                    writer.write_table(pyarrow.Table.from_pylist(rows, schema=schema))
+                    rows = []
+                if count >= part_size:
+                    break
+            if rows:
+                writer.write_table(pyarrow.Table.from_pylist(rows, schema=schema))
+        return count, last_id
+
+
+def parse_date(value):
+    if not value:
+        return None
+    parsed = datetime.fromisoformat(value)
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+if __name__ == "__main__":
+    # Export: python -m services.export_service exports/2025 --format parquet --start 2025-01-01
+    from utils.logging_config import setup_logging
+    parser = argparse.ArgumentParser(description="Stream conversations to NDJSON or Parquet part files")
+    parser.add_argument("output_dir")
+    parser.add_argument("--format", choices=["ndjson", "parquet"], default="ndjson")
+    parser.add_argument("--start", help="ISO date, inclusive (UTC)")
+    parser.add_argument("--end", help="ISO date, exclusive (UTC)")
+    parser.add_argument("--batch-size", type=int, default=Config.EXPORT_BATCH_SIZE)
+    parser.add_argument("--part-size", type=int, default=Config.EXPORT_PART_SIZE)
+    args = parser.parse_args()
+
+    setup_logging()
+    service = ExportService()
+    service.conversation_model.ensure_indexes()
+    result = service.export_to_directory(
+        args.output_dir, args.format, parse_date(args.start), parse_date(args.end),
+        args.batch_size, args.part_size
+    )
+    print(json.dumps(result))
@@ -0,0 +1,120 @@
+from datetime import datetime, timezone
+from threading import Event, Lock, Thread
+from config import Config
+from models.conversation import ConversationModel
+from models.database import pool_stats
+from services.ai_service import get_http_session, ai_requests_in_flight
+import os
+import time
+import pymongo
+import logging
+
+logger = logging.getLogger(__name__)
+
+class HealthMonitor:
+    """Refresh a health snapshot on a background thread so probes never touch Mongo or the AI API"""
+    def __init__(self, interval=None):
+        self.interval = interval or Config.HEALTH_REFRESH_SECONDS
+        self.lock = Lock()
+        self.stop_event = Event()
+        self.thread = None
+        self.pid = None
+        self.snapshot = None
+        self.refreshed_at = None
+
+    def start(self):
+        """Start the refresh thread for this process (again after a fork)"""
+        with self.lock:
+            if self.thread is not None and self.pid == os.getpid() and self.thread.is_alive():
+                return
+            self.pid = os.getpid()
+            self.stop_event = Event()
+            self.thread = Thread(target=self._run, name="health-monitor", daemon=True)
+            self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+
+    def _run(self):
+        while not self.stop_event.is_set():
+            try:
+                snapshot = self.get_snapshot()
+                # Warmup may have just refreshed synchronously
+                if snapshot is None or snapshot["age_seconds"] >= self.interval / 2:
+                    self.refresh()
+            except Exception as e:
+                logger.error(f"Health refresh failed: {str(e)}")
+            self.stop_event.wait(self.interval)
+
+    def check_mongo(self):
+        # Bound server selection too, or an unreachable cluster stalls the refresh for 30 s
+        with pymongo.timeout(Config.HEALTH_MONGO_TIMEOUT):
+            return ConversationModel().health_check()
+
+    def check_llm(self):
+        """Cheap reachability probe: any non-5xx answer means the API is up"""
+        started = time.perf_counter()
+        try:
+            response = get_http_session().get(
+                Config.LLM_HEALTH_URL,
+                headers={"Authorization": f"Bearer {Config.DEEPSEEK_API_KEY}"},
+                timeout=Config.TIMEOUT_PROFILE["fallback"]
+            )
+            return {
+                "reachable": response.status_code < 500,
+                "status_code": response.status_code,
+                "latency_ms": round((time.perf_counter() - started) * 1000, 1)
+            }
+        except Exception as e:
+            return {"reachable": False, "error": str(e)}
+
+    def check_pools(self):
+        mongo_busy = pool_stats.busiest()
+        ai_busy = ai_requests_in_flight()
+        return {
+            "mongo_checked_out": mongo_busy,
+            "mongo_saturation": round(mongo_busy / Config.MONGO_MAX_POOL_SIZE, 3),
+            "ai_in_flight": ai_busy,
+            "ai_saturation": round(ai_busy / Config.HTTP_POOL_SIZE, 3)
+        }
+
+    def refresh(self):
+        mongo = self.check_mongo()
+        llm = self.check_llm()
+        pools = self.check_pools()
+
+        if mongo["status"] != "success":
+            status = "error"
+        elif not llm["reachable"] or max(pools["mongo_saturation"], pools["ai_saturation"]) >= 1:
+            status = "degraded"
+        else:
+            status = "ok"
+
+        snapshot = {
+            "status": status,
+            "checked_at": datetime.now(timezone.utc).isoformat(),
+            "mongo": mongo,
+            "llm": llm,
+            "pools": pools
+        }
+        with self.lock:
+            self.snapshot = snapshot
+            self.refreshed_at = time.monotonic()
+        return snapshot
+
+    def get_snapshot(self):
+        """Latest snapshot with its age, or None before the first refresh"""
+        with self.lock:
+            if self.snapshot is None:
+                return None
+            return {**self.snapshot, "age_seconds": round(time.monotonic() - self.refreshed_at, 1)}
+
+    def is_ready(self, snapshot):
+        """Ready when the snapshot is fresh and Mongo answered; a slow LLM only degrades"""
+        return (
+            snapshot is not None
+            and snapshot["age_seconds"] <= Config.HEALTH_MAX_AGE_SECONDS
+            and snapshot["mongo"]["status"] == "success"
+        )
+
+health_monitor = HealthMonitor()
@@ -0,0 +1,184 @@
+from collections import Counter
+from pymongo import UpdateOne
+from config import Config
+from models.conversation import ConversationModel
+from models.topic_index import TopicIndexModel
+import math
+import re
+import logging
+
+logger = logging.getLogger(__name__)
+
+TOKEN_PATTERN = re.compile(r"[a-z]+(?:'[a-z]+)?")
+
+STOPWORDS = frozenset("""
+a about above after again against ago ah ai all almost also always am an and any anything are aren't
+around as ask asked at away back be because been before being below best better between big both
+but by can can't cannot come could couldn't did didn't do does doesn't doing don't done down during
+each else even ever every everything few find first for from fun get gets getting give go goes going
+gonna good got great had hadn't has hasn't have haven't having he he's hello her here hers herself
+hey hi him himself his how i i'd i'll i'm i've if in into is isn't it it's its itself just kind know
+last let let's like little lot lots made make makes many may maybe me mean might more most much must
+my myself need never new next nice no nor not nothing now of off oh ok okay on once one only or other
+our ours ourselves out over own please pretty question questions re really right said same say says
+see she she's should shouldn't so some something sometimes sounds still such sure take tell than
+thank thanks that that's the their theirs them themselves then there there's these they they're
+thing things think this those though through to too try two um under until up us use used very
+want wants was wasn't way we we're we've well went were weren't what what's when where which while
+who who's why will with won't would wouldn't wow yeah yes yet you you'd you'll you're you've your
+yours yourself yourselves zzz
+""".split())
+
+def messages_to_text(messages):
+    """Flatten stored chat messages (or plain text) into a single string"""
+    if isinstance(messages, str):
+        return messages
+    parts = []
+    for message in messages or []:
+        if isinstance(message, dict):
+            parts.append(message.get("text") or message.get("content") or "")
+        else:
+            parts.append(str(message))
+    return "\n".join(parts)
+
+class TopicService:
+    def __init__(self, topic_index=None):
+        self.topic_index = topic_index or TopicIndexModel()
+
+    def tokenize(self, messages):
+        """Split text into runs of content words, breaking runs at stopwords"""
+        runs = []
+        current = []
+        for token in TOKEN_PATTERN.findall(messages_to_text(messages).lower()):
+            if len(token) < 3 or token in STOPWORDS:
+                if current:
+                    runs.append(current)
+                    current = []
+                continue
+            current.append(token)
+        if current:
+            runs.append(current)
+        return runs
+
+    def candidate_terms(self, messages):
+        """Count unigram and adjacent-bigram candidates for a conversation"""
+        counts = Counter()
+        for run in self.tokenize(messages):
+            counts.update(run)
+            counts.update(f"{first} {second}" for first, second in zip(run, run[1:]))
+        return counts
+
+    def scorable_terms(self, counts):
+        """Terms that can become topics: every unigram, and phrases seen at least twice"""
+        # A phrase seen once is usually just two words that happened to touch
+        return {term for term, count in counts.items() if " " not in term or count >= 2}
+
+    def _score(self, counts, doc_count, frequencies, max_topics):
+        """Rank candidates by TF-IDF and compute a confidence for the ranking"""
+        unigram_total = sum(count for term, count in counts.items() if " " not in term)
+        if not unigram_total:
+            return {"topics": [], "scores": [], "confidence": 0.0}
+
+        scored = []
+        for term in self.scorable_terms(counts):
+            count = counts[term]
+            is_phrase = " " in term
+            idf = math.log((1 + doc_count) / (1 + frequencies.get(term, 0))) + 1
+            score = (count / unigram_total) * idf
+            if is_phrase:
+                score *= Config.TOPIC_PHRASE_BOOST
+            scored.append((score, term))
+        scored.sort(key=lambda item: (-item[0], item[1]))
+
+        topics = []
+        scores = []
+        covered = set()
+        for score, term in scored:
+            words = term.split()
+            # One slot per topic: skip a word or phrase once any of its words is already listed
+            if any(word in covered for word in words):
+                continue
+            topics.append(term)
+            scores.append(round(score, 4))
+            covered.update(words)
+            if len(topics) >= max_topics:
+                break
+
+        coverage = min(1.0, unigram_total / Config.TOPIC_MIN_TOKENS)
+        corpus = min(1.0, doc_count / Config.TOPIC_MIN_CORPUS_DOCS)
+        confidence = coverage * (0.5 + 0.5 * corpus)
+        return {"topics": topics, "scores": scores, "confidence": round(confidence, 3)}
+
+    def extract(self, messages, max_topics=None):
+        """Extract ranked topics for one conversation"""
+        max_topics = max_topics or Config.TOPIC_MAX_TOPICS
+        counts = self.candidate_terms(messages)
+        # One _id lookup for this conversation's terms instead of holding the whole table
+        doc_count, frequencies = self.topic_index.load_document_frequencies(self.scorable_terms(counts))
+        return self._score(counts, doc_count, frequencies, max_topics)
+
+    def extract_batch(self, conversations, max_topics=None):
+        """Extract topics for many conversations with a single IDF lookup"""
+        max_topics = max_topics or Config.TOPIC_MAX_TOPICS
+        all_counts = [self.candidate_terms(messages) for messages in conversations]
+        terms = set().union(*(self.scorable_terms(counts) for counts in all_counts))
+        doc_count, frequencies = self.topic_index.load_document_frequencies(terms)
+        return [self._score(counts, doc_count, frequencies, max_topics) for counts in all_counts]
+
+    def update_idf(self, messages):
+        """Add a finished conversation to the corpus-wide IDF table"""
+        terms = self.scorable_terms(self.candidate_terms(messages))
+        if not terms:
+            return
+        self.topic_index.increment_document_frequencies(terms)
+
+    def rebuild_idf(self, conversation_model=None, batch_size=500):
+        """Recompute the IDF table from every stored conversation"""
+        conversation_model = conversation_model or ConversationModel()
+        doc_count = 0
+        frequencies = Counter()
+        for _, messages in conversation_model.iter_messages(batch_size):
+            frequencies.update(self.scorable_terms(self.candidate_terms(messages)))
+            doc_count += 1
+
+        self.topic_index.replace_document_frequencies(doc_count, frequencies)
+        return doc_count
+
+    def backfill_topics(self, conversation_model=None, batch_size=500):
+        """Rewrite the topics array of every stored conversation"""
+        conversation_model = conversation_model or ConversationModel()
+        updated = 0
+        ids = []
+        conversations = []
+        for doc_id, messages in conversation_model.iter_messages(batch_size):
+            ids.append(doc_id)
+            conversations.append(messages)
+            if len(ids) >= batch_size:
+                updated += self._write_topics(conversation_model, ids, conversations)
+                ids, conversations = [], []
+        if ids:
+            updated += self._write_topics(conversation_model, ids, conversations)
+
+        # Cached /conversations responses carry the old topics
+        conversation_model.user_profiles.touch_all()
+        logger.info(f"Backfilled topics for {updated} conversations")
+        return updated
+
+    def _write_topics(self, conversation_model, ids, conversations):
+        results = self.extract_batch(conversations)
+        operations = [
+            UpdateOne({"_id": doc_id}, {"$set": {"topics": result["topics"]}})
+            for doc_id, result in zip(ids, results)
+        ]
+        conversation_model.conversations_col.bulk_write(operations, ordered=False)
+        return len(operations)
+
+
+if __name__ == "__main__":
+    # Backfill: python -m services.topic_service
+    from utils.logging_config import setup_logging
+    setup_logging()
+    ConversationModel().ensure_indexes()
+    topic_service = TopicService()
+    topic_service.rebuild_idf()
+    topic_service.backfill_topics()
@@ -0,0 +1,76 @@
+from types import SimpleNamespace
+from models.conversation import ConversationModel
+
+class StubCollection:
+    """Single-document stand-in for the conversations collection"""
+    def __init__(self, doc):
+        self.doc = doc
+
+    def _matches(self, query):
+        # Only equality and $ne, which is all the archive updates use
+        for key, condition in query.items():
+            value = self.doc.get(key)
+            if isinstance(condition, dict):
+                if value == condition["$ne"]:
+                    return False
+            elif value != condition:
+                return False
+        return True
+
+    def find_one(self, query, projection=None, sort=None):
+        return dict(self.doc) if self._matches(query) else None
+
+    def update_one(self, query, update):
+        if not self._matches(query):
+            return SimpleNamespace(modified_count=0)
+        self.doc.update(update.get("$set", {}))
+        for key in update.get("$unset", {}):
+            self.doc.pop(key, None)
+        return SimpleNamespace(modified_count=1)
+
+class StubArchive:
+    def __init__(self):
+        self.blobs = {}
+
+    def archive_messages(self, conversation_id, user_id, messages):
+        self.blobs[conversation_id] = messages
+        return {"archived": True, "archive_store": "memory", "archive_codec": "none", "message_count": len(messages)}
+
+    def load_messages(self, conversation):
+        return self.blobs[conversation["_id"]]
+
+    def delete_messages(self, conversation):
+        self.blobs.pop(conversation["_id"])
+
+class StubProfiles:
+    def __init__(self):
+        self.touched = []
+
+    def touch(self, user_id):
+        self.touched.append(user_id)
+
+def conversation_model(doc):
+    model = ConversationModel.__new__(ConversationModel)
+    model.conversations_col = StubCollection(doc)
+    model.archive = StubArchive()
+    model.user_profiles = StubProfiles()
+    return model
+
+def test_archive_and_restore_bump_the_users_version():
+    messages = [{"text": "hi"}, {"text": "hello"}, {"text": "bye"}]
+    model = conversation_model({"_id": 1, "user_id": "alice", "messages": messages})
+
+    assert model.archive_conversation(model.conversations_col.find_one({"_id": 1}))
+    assert "messages" not in model.conversations_col.doc
+    assert model.user_profiles.touched == ["alice"]
+
+    assert model.restore_conversation(1)
+    assert model.conversations_col.doc == {"_id": 1, "user_id": "alice", "messages": messages}
+    assert model.user_profiles.touched == ["alice", "alice"]
+
+def test_archiving_twice_does_not_bump_again():
+    model = conversation_model({"_id": 1, "user_id": "alice", "messages": [{"text": "hi"}]})
+    conversation = model.conversations_col.find_one({"_id": 1})
+    assert model.archive_conversation(conversation)
+    assert not model.archive_conversation(conversation)
+    assert model.user_profiles.touched == ["alice"]
@@ -0,0 +1,119 @@
+import gzip
+from datetime import datetime, timedelta, timezone
+import pytest
+from flask import Flask, jsonify, request
+from config import Config
+from utils import compression, http_cache
+from utils.compression import compress_response
+from utils.http_cache import conditional_user_get
+
+UPDATED_AT = datetime(2025, 3, 1, 12, 30, tzinfo=timezone.utc)
+
+class StubUserProfileModel:
+    """Stand-in for UserProfileModel holding version stamps in memory"""
+    versions = {}
+    fail = False
+
+    def get_version(self, user_id):
+        if self.fail:
+            raise RuntimeError("mongo down")
+        return self.versions.get(user_id, (0, None))
+
+@pytest.fixture
+def client(monkeypatch):
+    StubUserProfileModel.versions = {"alice": (3, UPDATED_AT)}
+    StubUserProfileModel.fail = False
+    monkeypatch.setattr(http_cache, "UserProfileModel", StubUserProfileModel)
+    monkeypatch.setattr(compression, "brotli", None)
+
+    app = Flask(__name__)
+    app.view_calls = 0
+
+    @app.route("/items/<user_id>")
+    @conditional_user_get
+    def items(user_id):
+        app.view_calls += 1
+        if user_id == "missing":
+            return jsonify({"error": "not found"}), 404
+        size = int(request.args.get("size", 10))
+        return jsonify({"user_id": user_id, "items": ["item"] * size})
+
+    @app.after_request
+    def compress(response):
+        return compress_response(response, request)
+
+    return app.test_client()
+
+def test_first_get_returns_validators(client):
+    response = client.get("/items/alice")
+    assert response.status_code == 200
+    assert response.headers["ETag"].startswith('W/"')
+    assert response.headers["Cache-Control"] == "no-cache"
+    assert response.last_modified == UPDATED_AT
+
+def test_matching_etag_answers_304_without_running_the_view(client):
+    etag = client.get("/items/alice").headers["ETag"]
+    response = client.get("/items/alice", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.data == b""
+    assert response.headers["ETag"] == etag
+    assert client.application.view_calls == 1
+
+def test_version_bump_invalidates_etag(client):
+    etag = client.get("/items/alice").headers["ETag"]
+    StubUserProfileModel.versions["alice"] = (4, UPDATED_AT + timedelta(seconds=5))
+    response = client.get("/items/alice", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+def test_query_string_is_part_of_the_etag(client):
+    assert client.get("/items/alice?size=1").headers["ETag"] != client.get("/items/alice?size=2").headers["ETag"]
+
+def test_etags_differ_between_users(client):
+    StubUserProfileModel.versions["bob"] = (3, UPDATED_AT)
+    assert client.get("/items/alice").headers["ETag"] != client.get("/items/bob").headers["ETag"]
+
+def test_if_modified_since(client):
+    fresh = client.get("/items/alice", headers={"If-Modified-Since": "Sat, 01 Mar 2025 12:30:00 GMT"})
+    stale = client.get("/items/alice", headers={"If-Modified-Since": "Sat, 01 Mar 2025 12:29:59 GMT"})
+    assert fresh.status_code == 304
+    assert stale.status_code == 200
+
+def test_if_none_match_takes_precedence_over_if_modified_since(client):
+    response = client.get("/items/alice", headers={
+        "If-None-Match": 'W/"other"',
+        "If-Modified-Since": "Sat, 01 Mar 2025 12:30:00 GMT"
+    })
+    assert response.status_code == 200
+
+def test_errors_are_not_tagged(client):
+    response = client.get("/items/missing")
+    assert response.status_code == 404
+    assert "ETag" not in response.headers
+
+def test_version_lookup_failure_serves_the_view(client):
+    StubUserProfileModel.fail = True
+    response = client.get("/items/alice")
+    assert response.status_code == 200
+    assert "ETag" not in response.headers
+
+def test_large_json_is_gzipped(client):
+    size = Config.COMPRESSION_MIN_SIZE
+    response = client.get(f"/items/alice?size={size}", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["Vary"]
+    assert b'"user_id":"alice"' in gzip.decompress(response.data).replace(b" ", b"")
+
+def test_gzipped_response_keeps_weak_etag_and_answers_304(client):
+    url = f"/items/alice?size={Config.COMPRESSION_MIN_SIZE}"
+    etag = client.get(url, headers={"Accept-Encoding": "gzip"}).headers["ETag"]
+    assert etag.startswith('W/"')
+    response = client.get(url, headers={"Accept-Encoding": "gzip", "If-None-Match": etag})
+    assert response.status_code == 304
+
+def test_small_or_unaccepted_responses_are_not_compressed(client):
+    small = client.get("/items/alice?size=1", headers={"Accept-Encoding": "gzip"})
+    assert "Content-Encoding" not in small.headers
+    assert "Accept-Encoding" in small.headers["Vary"]
+    plain = client.get(f"/items/alice?size={Config.COMPRESSION_MIN_SIZE}")
+    assert "Content-Encoding" not in plain.headers
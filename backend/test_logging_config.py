@@ -0,0 +1,89 @@
+import json
+import logging
+import queue
+import sys
+import types
+from utils import logging_config
+from utils.logging_config import DroppingQueueHandler, JsonFormatter, SamplingFilter
+
+def make_record(name="app", level=logging.INFO, msg="hello %s", args=("world",), exc_info=None):
+    return logging.LogRecord(name, level, __file__, 1, msg, args, exc_info)
+
+def failing_record():
+    try:
+        1 / 0
+    except ZeroDivisionError:
+        return make_record(level=logging.ERROR, msg="boom %s", args=(42,), exc_info=sys.exc_info())
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+def test_rate_limit_allows_burst_then_refills(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(logging_config, "time", types.SimpleNamespace(monotonic=clock))
+    sampling = SamplingFilter(rate_limits={"noisy": 2})
+
+    assert [sampling.filter(make_record("noisy")) for _ in range(3)] == [True, True, False]
+    clock.now += 0.5
+    assert sampling.filter(make_record("noisy"))
+    assert not sampling.filter(make_record("noisy"))
+
+def test_rate_limit_uses_most_specific_prefix(monkeypatch):
+    monkeypatch.setattr(logging_config, "time", types.SimpleNamespace(monotonic=FakeClock()))
+    sampling = SamplingFilter(rate_limits={"routes": 1, "routes.chat": 100})
+
+    assert all(sampling.filter(make_record("routes.chat.stream")) for _ in range(50))
+    assert sampling.filter(make_record("routes.health"))
+    assert not sampling.filter(make_record("routes.health"))
+    assert all(sampling.filter(make_record("other")) for _ in range(50))
+
+def test_warnings_and_above_always_pass():
+    sampling = SamplingFilter(sample_rates={"noisy": 0.0}, rate_limits={"noisy": 1})
+
+    assert not sampling.filter(make_record("noisy", logging.INFO))
+    for level in (logging.WARNING, logging.ERROR, logging.CRITICAL):
+        assert all(sampling.filter(make_record("noisy", level)) for _ in range(10))
+
+def test_full_queue_drops_instead_of_blocking(monkeypatch):
+    monkeypatch.setattr(DroppingQueueHandler, "dropped", 0)
+    handler = DroppingQueueHandler(queue.Queue(1))
+
+    handler.handle(make_record())
+    handler.handle(make_record())
+    assert handler.queue.qsize() == 1
+    assert DroppingQueueHandler.dropped == 1
+
+def queued(record):
+    handler = DroppingQueueHandler(queue.Queue())
+    handler.handle(record)
+    return handler.queue.get_nowait()
+
+def test_exception_text_survives_queue_in_text_output():
+    record = queued(failing_record())
+    assert record.exc_info is None
+    assert record.getMessage() == "boom 42"
+
+    output = logging.Formatter("%(levelname)s %(message)s").format(record)
+    assert output.startswith("ERROR boom 42\nTraceback (most recent call last):")
+    assert output.count("ZeroDivisionError") == 1
+
+def test_exception_text_survives_queue_in_json_output():
+    entry = json.loads(JsonFormatter().format(queued(failing_record())))
+    assert entry["message"] == "boom 42"
+    assert entry["exception"].startswith("Traceback (most recent call last):")
+    assert entry["exception"].rstrip().endswith("ZeroDivisionError: division by zero")
+
+def test_prepare_leaves_the_original_record_alone():
+    record = failing_record()
+    queued(record)
+    assert record.exc_info is not None
+    assert record.msg == "boom %s"
+
+def test_json_formatter_without_queue_still_formats_exceptions():
+    entry = json.loads(JsonFormatter().format(failing_record()))
+    assert "ZeroDivisionError" in entry["exception"]
+    assert "exception" not in json.loads(JsonFormatter().format(make_record()))
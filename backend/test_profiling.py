@@ -0,0 +1,81 @@
+import os
+import sys
+import types
+import pytest
+from flask import Flask
+from config import Config
+from utils import profiling
+from utils.profiling import init_profiling
+
+ADMIN = {"X-Admin-Token": "secret"}
+
+@pytest.fixture
+def client(monkeypatch, tmp_path):
+    monkeypatch.setattr(Config, "ADMIN_TOKEN", "secret")
+    monkeypatch.setattr(Config, "PROFILE_DIR", str(tmp_path))
+    monkeypatch.setattr(Config, "PROFILE_SAMPLE_RATE", 0)
+    monkeypatch.setattr(Config, "PROFILE_TRACEMALLOC", False)
+
+    app = Flask(__name__)
+    init_profiling(app)
+
+    @app.route("/work")
+    def work():
+        return str(sum(i * i for i in range(1000)))
+
+    return app.test_client()
+
+def saved_files():
+    return sorted(os.listdir(Config.PROFILE_DIR))
+
+def test_cprofile_request_saves_a_profile_and_releases_the_lock(client):
+    response = client.get("/work", headers={**ADMIN, "X-Profile": "cprofile"})
+    assert response.status_code == 200
+    assert "X-Profile-Id" in response.headers
+    assert [name.endswith(".prof") for name in saved_files()] == [True]
+    assert not profiling._cprofile_lock.locked()
+
+def test_concurrent_cprofile_request_is_served_unprofiled(client):
+    assert profiling._cprofile_lock.acquire(blocking=False)
+    try:
+        response = client.get("/work", headers={**ADMIN, "X-Profile": "cprofile"})
+    finally:
+        profiling._cprofile_lock.release()
+    assert response.status_code == 200
+    assert "X-Profile-Id" not in response.headers
+    assert saved_files() == []
+
+def test_failing_profiler_never_fails_the_request(client, monkeypatch):
+    class BusyProfile:
+        def enable(self):
+            raise ValueError("Another profiling tool is already active")
+    monkeypatch.setattr(profiling.cProfile, "Profile", BusyProfile)
+
+    response = client.get("/work", headers={**ADMIN, "X-Profile": "cprofile"})
+    assert response.status_code == 200
+    assert "X-Profile-Id" not in response.headers
+    assert not profiling._cprofile_lock.locked()
+
+def test_unknown_profile_mode_is_ignored(client):
+    response = client.get("/work", headers={**ADMIN, "X-Profile": "0"})
+    assert response.status_code == 200
+    assert "X-Profile-Id" not in response.headers
+
+def test_profile_header_requires_admin_token(client):
+    response = client.get("/work", headers={"X-Profile": "cprofile"})
+    assert "X-Profile-Id" not in response.headers
+
+def test_sample_mode_falls_back_to_cprofile_under_gevent(client, monkeypatch):
+    monkey = types.SimpleNamespace(is_module_patched=lambda name: name == "threading")
+    monkeypatch.setitem(sys.modules, "gevent.monkey", monkey)
+
+    response = client.get("/work", headers={**ADMIN, "X-Profile": "sample"})
+    assert response.status_code == 200
+    assert [name.endswith(".prof") for name in saved_files()] == [True]
+
+def test_memory_profile_releases_tracemalloc(client):
+    response = client.get("/work", headers={**ADMIN, "X-Profile-Memory": "1"})
+    assert response.status_code == 200
+    assert [name.endswith(".tracemalloc.txt") for name in saved_files()] == [True]
+    assert not profiling._tracemalloc_lock.locked()
+    assert not profiling.tracemalloc.is_tracing()
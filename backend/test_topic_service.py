@@ -0,0 +1,121 @@
+from config import Config
+from services.topic_service import TopicService, messages_to_text
+
+class StubTopicIndex:
+    """In-memory stand-in for TopicIndexModel"""
+    def __init__(self, doc_count=0, frequencies=None):
+        self.doc_count = doc_count
+        self.frequencies = dict(frequencies or {})
+        self.lookups = []
+        self.increments = []
+
+    def load_document_frequencies(self, terms=None):
+        self.lookups.append(terms)
+        if terms is None:
+            return self.doc_count, dict(self.frequencies)
+        return self.doc_count, {term: df for term, df in self.frequencies.items() if term in terms}
+
+    def increment_document_frequencies(self, terms, documents=1):
+        self.increments.append(set(terms))
+
+def chat(*texts):
+    return [{"text": text, "sender": "child" if i % 2 == 0 else "AI"} for i, text in enumerate(texts)]
+
+VOLCANO_CHAT = chat(
+    "Why do volcanoes erupt?",
+    "Volcanoes erupt when hot lava and gas push up from deep inside the earth.",
+    "Is lava hotter than fire? Do all volcanoes erupt?",
+    "Lava can be hotter than a campfire. Not all volcanoes erupt, some are sleeping."
+)
+
+def test_messages_to_text_accepts_strings_dicts_and_none():
+    assert messages_to_text("plain text") == "plain text"
+    assert messages_to_text([{"text": "hi"}, {"content": "there"}, "raw"]) == "hi\nthere\nraw"
+    assert messages_to_text(None) == ""
+
+def test_tokenize_breaks_runs_at_stopwords_and_short_words():
+    runs = TopicService(StubTopicIndex()).tokenize("Tell me about the solar system, ok? Big red planets")
+    assert runs == [["solar", "system"], ["red", "planets"]]
+
+def test_candidate_terms_counts_unigrams_and_adjacent_bigrams():
+    counts = TopicService(StubTopicIndex()).candidate_terms("solar system. The solar system!")
+    assert counts["solar"] == 2
+    assert counts["system"] == 2
+    assert counts["solar system"] == 2
+    assert "system solar" not in counts
+
+def test_extract_ranks_repeated_phrase_first():
+    result = TopicService(StubTopicIndex()).extract(chat(
+        "Tell me about the solar system and planets",
+        "The solar system has eight planets. Jupiter is the biggest planet in the solar system!"
+    ))
+    assert result["topics"][0] == "solar system"
+    assert "planets" in result["topics"]
+
+def test_extract_never_repeats_a_word_across_topics():
+    topics = TopicService(StubTopicIndex()).extract(VOLCANO_CHAT)["topics"]
+    words = [word for topic in topics for word in topic.split()]
+    assert len(words) == len(set(words)), topics
+    assert "volcanoes erupt" in topics
+    assert "volcanoes" not in topics
+
+def test_extract_respects_max_topics():
+    result = TopicService(StubTopicIndex()).extract(VOLCANO_CHAT, max_topics=2)
+    assert len(result["topics"]) == 2
+    assert len(result["scores"]) == 2
+
+def test_extract_empty_conversation_has_zero_confidence():
+    assert TopicService(StubTopicIndex()).extract(chat("hi", "hello!")) == {
+        "topics": [], "scores": [], "confidence": 0.0
+    }
+
+def test_idf_prefers_rare_terms_over_common_ones():
+    index = StubTopicIndex(doc_count=100, frequencies={"dinosaurs": 90, "fossils": 1})
+    topics = TopicService(index).extract("dinosaurs fossils")["topics"]
+    assert topics == ["fossils", "dinosaurs"]
+
+def test_confidence_grows_with_corpus_size():
+    short_corpus = TopicService(StubTopicIndex(doc_count=0)).extract(VOLCANO_CHAT)["confidence"]
+    full_corpus = TopicService(StubTopicIndex(doc_count=Config.TOPIC_MIN_CORPUS_DOCS)).extract(VOLCANO_CHAT)["confidence"]
+    assert 0 < short_corpus < full_corpus <= 1
+
+def test_extract_looks_up_only_scorable_terms():
+    index = StubTopicIndex()
+    TopicService(index).extract("solar system solar system. Red planets")
+    assert index.lookups == [{"solar", "system", "solar system", "red", "planets"}]
+
+def test_extract_batch_looks_up_idf_once():
+    index = StubTopicIndex()
+    results = TopicService(index).extract_batch([VOLCANO_CHAT, "solar system solar system"])
+    assert len(index.lookups) == 1
+    assert {"lava", "solar system"} <= index.lookups[0]
+    assert results[1]["topics"][0] == "solar system"
+
+def test_update_idf_skips_phrases_seen_once():
+    index = StubTopicIndex()
+    TopicService(index).update_idf("lava lava lava volcano")
+    assert index.increments == [{"lava", "volcano", "lava lava"}]
+
+class StubConversationModel:
+    """Just enough of ConversationModel for the backfill job"""
+    def __init__(self, conversations):
+        self.conversations = conversations
+        self.writes = []
+        self.versions_bumped = False
+        self.conversations_col = self
+        self.user_profiles = self
+
+    def iter_messages(self, batch_size=500):
+        return iter(self.conversations.items())
+
+    def bulk_write(self, operations, ordered=True):
+        self.writes.extend(operations)
+
+    def touch_all(self):
+        self.versions_bumped = True
+
+def test_backfill_rewrites_topics_and_bumps_versions():
+    conversations = StubConversationModel({1: VOLCANO_CHAT, 2: "solar system solar system"})
+    assert TopicService(StubTopicIndex()).backfill_topics(conversations, batch_size=1) == 2
+    assert [op._doc["$set"]["topics"][0] for op in conversations.writes] == ["volcanoes erupt", "solar system"]
+    assert conversations.versions_bumped
@@ -0,0 +1,18 @@
+from flask import request, jsonify
+from functools import wraps
+from config import Config
+import hmac
+
+def is_admin_request():
+    """True when the request carries the configured admin token"""
+    token = request.headers.get("X-Admin-Token")
+    return bool(Config.ADMIN_TOKEN and token and hmac.compare_digest(token, Config.ADMIN_TOKEN))
+
+def admin_required(view):
+    """Reject requests without the admin token (admin endpoints are off when ADMIN_TOKEN is unset)"""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if not is_admin_request():
+            return jsonify({"error": "Forbidden"}), 403
+        return view(*args, **kwargs)
+    return wrapper
@@ -0,0 +1,41 @@
+from flask import request, make_response
+from functools import wraps
+from models.user_profile import UserProfileModel
+import hashlib
+import logging
+
+logger = logging.getLogger(__name__)
+
+def _not_modified(etag, updated_at):
+    """Evaluate If-None-Match first, falling back to If-Modified-Since"""
+    if request.if_none_match:
+        return request.if_none_match.contains_weak(etag)
+    if request.if_modified_since and updated_at:
+        return updated_at.replace(microsecond=0, tzinfo=None) <= request.if_modified_since.replace(tzinfo=None)
+    return False
+
+def conditional_user_get(view):
+    """Answer per-user GETs with 304 when the user's version stamp hasn't moved"""
+    @wraps(view)
+    def wrapper(user_id, *args, **kwargs):
+        try:
+            version, updated_at = UserProfileModel().get_version(user_id)
+        except Exception as e:
+            logger.error(f"Version lookup failed for {user_id}: {str(e)}")
+            return view(user_id, *args, **kwargs)
+
+        # The query string selects the representation, so it is part of the tag
+        etag = hashlib.sha1(f"{user_id}:{version}:{request.full_path}".encode()).hexdigest()[:20]
+        if _not_modified(etag, updated_at):
+            response = make_response("", 304)
+        else:
+            response = make_response(view(user_id, *args, **kwargs))
+            if response.status_code != 200:
+                return response
+
+        response.set_etag(etag, weak=True)
+        if updated_at:
+            response.last_modified = updated_at
+        response.headers["Cache-Control"] = "no-cache"
+        return response
+    return wrapper
@@ -1,38 +1,195 @@
+import atexit
+import json
 import logging
+import logging.handlers
+import os
+import queue
+import random
 import sys
-from datetime import datetime
+import threading
+import time
+from datetime import datetime, timezone
+from flask import g, has_request_context
+from config import Config
 
-def setup_logging():
-    """Configure comprehensive logging for the application"""
-    
-    # Create custom formatter for conversation events
-    class ConversationFormatter(logging.Formatter):
-        def format(self, record):
-            # Add timestamp and custom formatting for conversation events
-            if hasattr(record, 'user_id'):
-                record.msg = f"[USER: {record.user_id}] {record.msg}"
-            return super().format(record)
-    
-    # Configure logging
-    logging.basicConfig(
-        level=logging.INFO,
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        handlers=[
-            logging.StreamHandler(sys.stdout),
-            logging.FileHandler('conversations.log') if not sys.stdout.isatty() else logging.NullHandler()
-        ]
+_listener = None
+
+class RequestContextFilter(logging.Filter):
+    """Attach the current request/user ids to every record"""
+    def filter(self, record):
+        if has_request_context():
+            record.request_id = getattr(g, "request_id", None)
+            if not hasattr(record, "user_id"):
+                record.user_id = getattr(g, "user_id", None)
+        else:
+            record.request_id = getattr(record, "request_id", None)
+            record.user_id = getattr(record, "user_id", None)
+        return True
+
+class SamplingFilter(logging.Filter):
+    """Sample and rate limit INFO-and-below records per logger; warnings always pass"""
+    def __init__(self, sample_rates=None, rate_limits=None):
+        super().__init__()
+        self.sample_rates = sample_rates or {}
+        self.rate_limits = rate_limits or {}
+        self.buckets = {}  # logger name -> [tokens, last refill]
+        self.lock = threading.Lock()
+
+    def _lookup(self, settings, name):
+        # Most specific configured logger prefix wins
+        while name:
+            if name in settings:
+                return settings[name]
+            name = name.rpartition(".")[0]
+        return None
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING:
+            return True
+
+        sample_rate = self._lookup(self.sample_rates, record.name)
+        if sample_rate is not None and random.random() >= sample_rate:
+            return False
+
+        rate_limit = self._lookup(self.rate_limits, record.name)
+        if rate_limit is None:
+            return True
+        with self.lock:
+            now = time.monotonic()
+            tokens, last = self.buckets.get(record.name, (rate_limit, now))
+            tokens = min(rate_limit, tokens + (now - last) * rate_limit)
+            allowed = tokens >= 1
+            self.buckets[record.name] = (tokens - 1 if allowed else tokens, now)
+        return allowed
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line with request and user ids"""
+    def format(self, record):
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "request_id": getattr(record, "request_id", None),
+            "user_id": getattr(record, "user_id", None)
+        }
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            # Records from the queue carry only the pre-formatted text, see DroppingQueueHandler.prepare
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+class ConversationFormatter(logging.Formatter):
+    def format(self, record):
+        # Add timestamp and custom formatting for conversation events
+        if getattr(record, 'user_id', None):
+            # Records are shared between handlers on the listener thread, so prefix a copy
+            record = logging.makeLogRecord(record.__dict__)
+            record.msg = f"[USER: {record.user_id}] {record.msg}"
+        return super().format(record)
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """Never block a request on logging: drop records when the queue is full"""
+    dropped = 0
+
+    def prepare(self, record):
+        """Keep the traceback as exc_text; the base class folds it into msg and drops it"""
+        exc_text = record.exc_text
+        if record.exc_info:
+            exc_text = (self.formatter or logging.Formatter()).formatException(record.exc_info)
+        # Format once here, the traceback object itself can't cross the queue
+        record = logging.makeLogRecord(record.__dict__)
+        record.exc_info = None
+        record.exc_text = None
+        record = super().prepare(record)
+        record.exc_text = exc_text
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            DroppingQueueHandler.dropped += 1
+
+def _file_handler(filename):
+    """Build a file handler according to LOG_ROTATION"""
+    path = os.path.join(Config.LOG_DIR, filename)
+    if Config.LOG_MULTIPROCESS or Config.LOG_ROTATION == "external":
+        # Rotating from several processes loses and interleaves records; reopen after logrotate moves the file
+        return logging.handlers.WatchedFileHandler(path, encoding="utf-8")
+    if Config.LOG_ROTATION == "time":
+        return logging.handlers.TimedRotatingFileHandler(
+            path, when=Config.LOG_ROTATE_WHEN, backupCount=Config.LOG_BACKUP_COUNT, encoding="utf-8"
+        )
+    return logging.handlers.RotatingFileHandler(
+        path, maxBytes=Config.LOG_MAX_BYTES, backupCount=Config.LOG_BACKUP_COUNT, encoding="utf-8"
     )
-    
+
+def _text_formatter(fmt):
+    if Config.LOG_FORMAT == "json":
+        return JsonFormatter()
+    return logging.Formatter(fmt)
+
+def setup_logging():
+    """Configure non-blocking logging: request threads enqueue, a listener thread writes"""
+    global _listener
+    stop_logging()
+
+    app_fmt = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(_text_formatter(app_fmt))
+    handlers = [stream_handler]
+    if not sys.stdout.isatty():
+        app_file_handler = _file_handler('conversations.log')
+        app_file_handler.setFormatter(_text_formatter(app_fmt))
+        handlers.append(app_file_handler)
+
+    # Conversation events go to their own file, routed by logger name on the listener side
+    conv_handler = _file_handler('conversation_events.log')
+    if Config.LOG_FORMAT == "json":
+        conv_handler.setFormatter(JsonFormatter())
+    else:
+        conv_handler.setFormatter(ConversationFormatter(
+            '%(asctime)s - CONVERSATION - %(levelname)s - %(message)s'
+        ))
+    conv_handler.addFilter(lambda record: record.name == 'conversations' or record.name.startswith('conversations.'))
+
+    log_queue = queue.Queue(Config.LOG_QUEUE_SIZE)
+    queue_handler = DroppingQueueHandler(log_queue)
+    queue_handler.addFilter(SamplingFilter(Config.LOG_SAMPLE_RATES, Config.LOG_RATE_LIMITS))
+    queue_handler.addFilter(RequestContextFilter())
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(Config.LOG_LEVEL)
+
     # Set specific log levels
     logging.getLogger('werkzeug').setLevel(logging.WARNING)
     logging.getLogger('urllib3').setLevel(logging.WARNING)
-    
-    # Create conversation-specific logger
-    conv_logger = logging.getLogger('conversations')
-    conv_handler = logging.FileHandler('conversation_events.log')
-    conv_formatter = ConversationFormatter(
-        '%(asctime)s - CONVERSATION - %(levelname)s - %(message)s'
+    logging.getLogger('conversations').setLevel(logging.INFO)
+
+    _listener = logging.handlers.QueueListener(
+        log_queue, *handlers, conv_handler, respect_handler_level=True
     )
-    conv_handler.setFormatter(conv_formatter)
-    conv_logger.addHandler(conv_handler)
-    conv_logger.setLevel(logging.INFO)
+    _listener.start()
+    return _listener
+
+def stop_logging():
+    """Flush queued records and stop the listener thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
+def reinit_after_fork():
+    """Start a fresh queue and listener in a forked worker; the parent's listener thread doesn't survive fork"""
+    global _listener
+    _listener = None
+    return setup_logging()
+
+atexit.register(stop_logging)
@@ -0,0 +1,219 @@
+from flask import request, g
+from collections import Counter
+from threading import Event, Lock, Thread
+from config import Config
+from utils.admin import is_admin_request
+import cProfile
+import json
+import os
+import random
+import sys
+import threading
+import time
+import tracemalloc
+import uuid
+import logging
+
+logger = logging.getLogger(__name__)
+
+PROFILE_MODES = ("sample", "cprofile")
+
+# tracemalloc and cProfile are process-wide, so only one request uses each at a time
+_tracemalloc_lock = Lock()
+_cprofile_lock = Lock()
+_warned_gevent = False
+
+class StackSampler:
+    """Statistical profiler: samples one thread's Python stack at a fixed interval"""
+    def __init__(self, thread_id, interval):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self.stop_event = Event()
+        self.thread = Thread(target=self._run, name="request-profiler", daemon=True)
+
+    def start(self):
+        self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+        self.thread.join()
+
+    def _run(self):
+        while not self.stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if stack:
+                self.stacks[tuple(reversed(stack))] += 1
+
+    def collapsed(self):
+        """Brendan Gregg collapsed-stack format, one 'a;b;c count' line per stack"""
+        return "".join(f"{';'.join(stack)} {count}\n" for stack, count in self.stacks.most_common())
+
+    def speedscope(self, name):
+        frames = []
+        frame_index = {}
+        samples = []
+        weights = []
+        for stack, count in self.stacks.items():
+            indices = []
+            for frame in stack:
+                if frame not in frame_index:
+                    frame_index[frame] = len(frames)
+                    frames.append({"name": frame})
+                indices.append(frame_index[frame])
+            samples.append(indices)
+            weights.append(count * self.interval * 1000)
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "shared": {"frames": frames},
+            "profiles": [{
+                "type": "sampled",
+                "name": name,
+                "unit": "milliseconds",
+                "startValue": 0,
+                "endValue": sum(weights),
+                "samples": samples,
+                "weights": weights
+            }]
+        }
+
+def _gevent_patched():
+    """Greenlets share one OS thread, so sys._current_frames() can't see the request's stack"""
+    monkey = sys.modules.get("gevent.monkey")
+    return monkey is not None and monkey.is_module_patched("threading")
+
+def _profile_mode(mode):
+    global _warned_gevent
+    if mode not in PROFILE_MODES:
+        logger.warning(f"Ignoring unknown profile mode {mode!r}, expected one of {PROFILE_MODES}")
+        return None
+    if mode == "sample" and _gevent_patched():
+        if not _warned_gevent:
+            logger.warning("Stack sampling doesn't work under gevent, using cprofile instead "
+                           "(the profile covers every greenlet that ran during the request)")
+            _warned_gevent = True
+        return "cprofile"
+    return mode
+
+def _should_profile():
+    if request.headers.get("X-Profile") and is_admin_request():
+        return _profile_mode(request.headers["X-Profile"])
+    if Config.PROFILE_SAMPLE_RATE and random.random() < Config.PROFILE_SAMPLE_RATE:
+        return _profile_mode(Config.PROFILE_DEFAULT_MODE)
+    return None
+
+def _prune(directory):
+    """Keep only the newest PROFILE_MAX_FILES profiles"""
+    try:
+        entries = sorted(
+            (entry for entry in os.scandir(directory) if entry.is_file()),
+            key=lambda entry: entry.stat().st_mtime
+        )
+        for entry in entries[:-Config.PROFILE_MAX_FILES]:
+            os.remove(entry.path)
+    except OSError as e:
+        logger.warning(f"Failed to prune profiles: {str(e)}")
+
+def start_profile():
+    mode = _should_profile()
+    memory = Config.PROFILE_TRACEMALLOC or (request.headers.get("X-Profile-Memory") and is_admin_request())
+    if not mode and not memory:
+        return
+
+    # Registered before any collector starts so finish_profile cleans up even if a later step fails
+    profile = g.profile = {"id": uuid.uuid4().hex[:12], "started": time.perf_counter()}
+    try:
+        # A concurrent profiled request already owns cProfile: skip rather than wait or mix profiles
+        if mode == "cprofile" and _cprofile_lock.acquire(blocking=False):
+            profile["cprofile_locked"] = True
+            profiler = cProfile.Profile()
+            profiler.enable()
+            profile["cprofile"] = profiler
+        elif mode == "sample":
+            profile["sampler"] = StackSampler(threading.get_ident(), Config.PROFILE_INTERVAL)
+            profile["sampler"].start()
+
+        if memory and _tracemalloc_lock.acquire(blocking=False):
+            profile["tracemalloc_locked"] = True
+            profile["started_tracemalloc"] = not tracemalloc.is_tracing()
+            if profile["started_tracemalloc"]:
+                tracemalloc.start(Config.PROFILE_TRACEMALLOC_FRAMES)
+            profile["memory_before"] = tracemalloc.take_snapshot()
+    except Exception as e:
+        # e.g. ValueError on Python 3.12+ when another profiling tool is active
+        logger.warning(f"Failed to start profiling: {str(e)}")
+        _stop_collectors(profile)
+        g.pop("profile", None)
+        return
+    if not any(key in profile for key in ("cprofile", "sampler", "memory_before")):
+        _stop_collectors(profile)
+        g.pop("profile", None)
+
+def _stop_collectors(profile):
+    """Stop whatever start_profile managed to start and release the process-wide locks"""
+    memory_after = None
+    try:
+        if "cprofile" in profile:
+            profile["cprofile"].disable()
+        if "sampler" in profile:
+            profile["sampler"].stop()
+        if "memory_before" in profile:
+            memory_after = tracemalloc.take_snapshot()
+    except Exception as e:
+        logger.warning(f"Failed to stop profiling: {str(e)}")
+    finally:
+        if profile.get("started_tracemalloc") and tracemalloc.is_tracing():
+            tracemalloc.stop()
+        if profile.pop("tracemalloc_locked", False):
+            _tracemalloc_lock.release()
+        if profile.pop("cprofile_locked", False):
+            _cprofile_lock.release()
+    return memory_after
+
+def finish_profile(exc=None):
+    profile = g.pop("profile", None)
+    if profile is None:
+        return
+
+    elapsed_ms = (time.perf_counter() - profile["started"]) * 1000
+    name = f"{time.strftime('%Y%m%d-%H%M%S')}-{request.endpoint or 'unknown'}-{profile['id']}"
+    directory = Config.PROFILE_DIR
+
+    # Stop collectors before doing any I/O so the profile only covers the request
+    memory_after = _stop_collectors(profile)
+
+    try:
+        os.makedirs(directory, exist_ok=True)
+        if "cprofile" in profile:
+            profile["cprofile"].dump_stats(os.path.join(directory, f"{name}.prof"))
+        if "sampler" in profile:
+            sampler = profile["sampler"]
+            with open(os.path.join(directory, f"{name}.collapsed.txt"), "w") as f:
+                f.write(sampler.collapsed())
+            with open(os.path.join(directory, f"{name}.speedscope.json"), "w") as f:
+                json.dump(sampler.speedscope(f"{request.method} {request.path} ({elapsed_ms:.0f} ms)"), f)
+        if memory_after is not None:
+            stats = memory_after.compare_to(profile["memory_before"], "lineno")
+            with open(os.path.join(directory, f"{name}.tracemalloc.txt"), "w") as f:
+                f.write(f"{request.method} {request.path} ({elapsed_ms:.0f} ms)\n")
+                f.writelines(f"{stat}\n" for stat in stats[:Config.PROFILE_TRACEMALLOC_TOP])
+        _prune(directory)
+        logger.info(f"Saved profile {name} ({elapsed_ms:.0f} ms)")
+    except Exception as e:
+        logger.error(f"Failed to save profile {name}: {str(e)}")
+
+def init_profiling(app):
+    """Register the opt-in profiling hooks; a header lookup per request when not triggered"""
+    app.before_request(start_profile)
+    app.teardown_request(finish_profile)
+
+    @app.after_request
+    def tag_profiled_response(response):
+        if "profile" in g:
+            response.headers["X-Profile-Id"] = g.profile["id"]
+        return response
@@ -0,0 +1,115 @@
+from flask import request, g, has_request_context
+from datetime import datetime, timezone
+from threading import Lock, Thread
+from config import Config
+import hashlib
+import hmac
+import json
+import os
+import queue
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Request fields that are safe to keep verbatim; everything else is dropped or reduced to a length
+SAFE_FIELDS = ("action", "force_start")
+
+def hash_user_id(user_id):
+    """Stable within one capture salt, not reversible to the real id"""
+    return hmac.new(Config.CAPTURE_SALT.encode(), str(user_id).encode(), hashlib.sha256).hexdigest()[:16]
+
+def anonymize_body(data):
+    body = {key: data[key] for key in SAFE_FIELDS if key in data}
+    if "message" in data:
+        body["message_chars"] = len(str(data["message"]))
+    return body
+
+class CaptureWriter:
+    """Append trace records to an NDJSON file from a background thread"""
+    def __init__(self):
+        self.queue = queue.Queue(Config.CAPTURE_QUEUE_SIZE)
+        self.lock = Lock()
+        self.thread = None
+        self.pid = None
+        self.dropped = 0
+
+    def write(self, record):
+        self._ensure_started()
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def _ensure_started(self):
+        if self.thread is not None and self.pid == os.getpid():
+            return
+        with self.lock:
+            if self.thread is None or self.pid != os.getpid():
+                # New queue after a fork; the parent's writer thread is gone
+                self.queue = queue.Queue(Config.CAPTURE_QUEUE_SIZE)
+                self.pid = os.getpid()
+                self.thread = Thread(target=self._run, name="traffic-capture", daemon=True)
+                self.thread.start()
+
+    def _run(self):
+        os.makedirs(Config.CAPTURE_DIR, exist_ok=True)
+        while True:
+            record = self.queue.get()
+            day = datetime.now(timezone.utc).strftime("%Y%m%d")
+            path = os.path.join(Config.CAPTURE_DIR, f"capture-{day}-{self.pid}.ndjson")
+            try:
+                with open(path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(record) + "\n")
+                    # Drain whatever else is queued while the file is open
+                    while not self.queue.empty():
+                        f.write(json.dumps(self.queue.get_nowait()) + "\n")
+            except Exception as e:
+                logger.error(f"Failed to write capture trace: {str(e)}")
+
+capture_writer = CaptureWriter()
+
+def record_llm_call(latency_ms, response_chars):
+    """Called by AIService so replays can stub the LLM with realistic latencies"""
+    if has_request_context() and "capture" in g:
+        g.capture["llm"].append({"latency_ms": round(latency_ms, 1), "chars": response_chars})
+
+def start_capture():
+    if request.path not in Config.CAPTURE_PATHS:
+        return
+    g.capture = {"t": time.time(), "started": time.perf_counter(), "llm": []}
+
+def finish_capture(response):
+    capture = g.pop("capture", None)
+    if capture is None:
+        return response
+
+    if request.is_json:
+        data = request.get_json(silent=True) or {}
+    else:
+        data = request.form.to_dict()
+    record = {
+        "t": capture["t"],
+        "method": request.method,
+        "path": request.path,
+        "content_type": "json" if request.is_json else "form",
+        "user": hash_user_id(data["user_id"]) if data.get("user_id") else None,
+        "body": anonymize_body(data),
+        "status": response.status_code,
+        "latency_ms": round((time.perf_counter() - capture["started"]) * 1000, 1),
+        "llm": capture["llm"]
+    }
+    capture_writer.write(record)
+    return response
+
+def init_capture(app):
+    """Record anonymized traces of the chat endpoints when CAPTURE_ENABLED is set"""
+    if not Config.CAPTURE_ENABLED:
+        return
+    if not Config.CAPTURE_SALT:
+        # A per-process random salt would split one user into many across workers and restarts
+        logger.error("Traffic capture disabled: CAPTURE_ENABLED requires CAPTURE_SALT to be set")
+        return
+    app.before_request(start_capture)
+    app.after_request(finish_capture)
+    logger.info(f"Traffic capture enabled for {Config.CAPTURE_PATHS} -> {Config.CAPTURE_DIR}")
@@ -0,0 +1,8 @@
+from dotenv import load_dotenv
+
+# Load .env before config.py reads the environment
+load_dotenv()
+
+from app import create_app
+
+app = create_app()
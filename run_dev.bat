@@ -3,7 +3,7 @@ REM Initialize Conda for cmd.exe
 call %USERPROFILE%\miniconda3\Scripts\activate.bat
 call conda activate base
 
-REM Start backend in debug mode
+REM Start backend in debug mode (production uses: gunicorn -c gunicorn.conf.py)
 echo Starting backend server in debug mode...
 cd backend
 start "Backend Server" python app.py debug